@@ -1,4 +1,6 @@
+import numpy as np
 import gurobipy as gp
+from bnb.node import model_vars, model_constrs
 
 class ActivePathManager:
     def __init__(self, root_node,instance):
@@ -21,56 +23,55 @@ class ActivePathManager:
     def switch_focus(self, new_node, model):
         """
         Switch the current LP model from focus → new_node by:
-        - Undoing bounds up to the common ancestor.
-        - Reapplying bounds down to the new focus node.
+        - Computing the net bound delta between the two nodes.
+        - Pushing it to the LP with one bulk write per bound.
+        - Loading the fork parent basis, if any, in bulk as well.
         """
-        ancestor = self.find_common_ancestor(new_node)
+        idxs, lbs, ubs = self._bound_delta(self.focus, new_node)
+        if idxs:
+            vars = model_vars(model)
+            changed = [vars[i] for i in idxs]
+            model.setAttr("LB", changed, lbs)
+            model.setAttr("UB", changed, ubs)
 
-        # Step 1: Undo changes up to ancestor
-        current = self.focus
-        while current != ancestor:
-            self._undo_changes(current, model)
-            current = current.parent
-
-        # Step 2: Build path down to new node
-        path_down = []
-        node = new_node
-        while node != ancestor:
-            path_down.append(node)
-            node = node.parent
-        path_down.reverse()
-
-        # Step 3: Reapply changes
-        for node in path_down:
-            self._apply_changes(node, model)
-
-        # Step 4: Load LP warm start from fork parent if it exists
+        # Load LP warm start from fork parent if it exists
         if new_node.fork_parent and new_node.fork_parent.lp_basis:
             v_basis, c_basis = new_node.fork_parent.lp_basis
             try:
-                vars = model.getVars()
-                constrs = model.getConstrs()
-                for var, vb in zip(vars, v_basis):
-                    var.VBasis = vb
-                for constr, cb in zip(constrs, c_basis):
-                    constr.CBasis = cb
+                vars = model_vars(model)
+                constrs = model_constrs(model)
+                model.setAttr("VBasis", vars[:len(v_basis)], v_basis[:len(vars)].tolist())
+                # Cuts added after the fork stored its basis enter it as basic slacks
+                if len(c_basis) < len(constrs):
+                    c_basis = np.concatenate([c_basis, np.zeros(len(constrs) - len(c_basis), dtype=np.int8)])
+                model.setAttr("CBasis", constrs, c_basis[:len(constrs)].tolist())
             except gp.GurobiError:
                 print("CS")
 
         self.focus = new_node
         self.active_path = self._rebuild_path(new_node)
 
-    def _undo_changes(self, node, model):
-        for var_idx, _ in node.bound_changes.items():
-            var = model.getVars()[var_idx]
-            var.lb = -self.instance.lb[var_idx]
-            var.ub = self.instance.ub[var_idx]
-
-    def _apply_changes(self, node, model):
-        for var_idx, (lb, ub) in node.bound_changes.items():
-            var = model.getVars()[var_idx]
-            var.lb = lb
-            var.ub = ub
+    def _bound_delta(self, old_node, new_node):
+        """
+        Variables whose bounds differ between the LP of old_node and the LP of new_node,
+        with the bounds new_node needs. Variables only changed on the old path go back to
+        the bounds of the instance.
+        """
+        if old_node is new_node:
+            return [], [], []
+        old_bounds = old_node.accumulated_bounds()
+        new_bounds = new_node.accumulated_bounds()
+        idxs, lbs, ubs = [], [], []
+        for var_idx, bounds in new_bounds.items():
+            if old_bounds.get(var_idx) != bounds:
+                idxs.append(var_idx)
+                lbs.append(bounds[0])
+                ubs.append(bounds[1])
+        for var_idx in old_bounds.keys() - new_bounds.keys():
+            idxs.append(var_idx)
+            lbs.append(self.instance.lb[var_idx])
+            ubs.append(self.instance.ub[var_idx])
+        return idxs, lbs, ubs
 
     def _rebuild_path(self, node):
         path = []
@@ -1,17 +1,29 @@
 from bnb.node import Node
+from bnb.lp_pool import LPWorkerPool
+import numpy as np
+import gurobipy as gp
+from gurobipy import GRB
 import random
 
 class Branching:
-    def __init__(self, instance,strong_depth=10,k=1500):
+    def __init__(self, instance,strong_depth=10,k=1500,workers=1,reliability=None,sb_iter_limit=100,lookahead=8):
         self.instance = instance #Access to originalbounds, types, etc.
         self.strong_depth = strong_depth
         self.k = k
+        self.reliability = reliability #Pseudocount threshold of reliability branching, None = strong/pseudocost
+        self.sb_iter_limit = sb_iter_limit #Simplex iterations per strong branching child LP
+        self.lookahead = lookahead #Strong branchings without improvement before stopping
+        self.pool = LPWorkerPool(workers) if workers > 1 else None #Worker LP copies for strong branching
 
-        self.pseudocosts_up=[0.0]*instance.num_vars
-        self.pseudocosts_down=[0.0]*instance.num_vars
-        self.pseudocounts_up=[0]*instance.num_vars
-        self.pseudocounts_down=[0]*instance.num_vars
-        self.score=[0]*instance.num_vars
+        self.pseudocosts_up=np.zeros(instance.num_vars)
+        self.pseudocosts_down=np.zeros(instance.num_vars)
+        self.pseudocounts_up=np.zeros(instance.num_vars,dtype=int)
+        self.pseudocounts_down=np.zeros(instance.num_vars,dtype=int)
+        self.score=np.zeros(instance.num_vars)
+
+        # Running sums of the per-variable average pseudocosts, for the global averages
+        self.avg_sum_up=0.0
+        self.avg_sum_down=0.0
 
 
     def _select_k_strong_candidates(self,fractional_vars):
@@ -38,17 +50,15 @@ class Branching:
         return selected
 
     def select_branching_variable(self, node, solution,working_model,active_mgr,clique_cuts=False):
-        fractional_vars=[]
-        for i, val in enumerate(solution):
-            if self.instance.var_types[i] in ['B', 'I']:
-                if abs(val - round(val)) > 1e-6:
-                    fractional_vars.append((i, val))
+        fractional_vars=[(i, solution[i]) for i in node.fractional]
         if clique_cuts:
             original_fractional_vars = [(i, val) for i, val in fractional_vars if i < self.instance.original_num_vars]
         else:
             original_fractional_vars = fractional_vars
         if not original_fractional_vars:
             return None, None, None
+        if self.reliability is not None:
+            return self.reliability_branching(node,solution,original_fractional_vars,working_model,active_mgr)
         if node.depth<=self.strong_depth:
             selected=self._select_k_strong_candidates(original_fractional_vars)
             return self.strong_branching(node,solution,selected,working_model,active_mgr)
@@ -56,6 +66,8 @@ class Branching:
             return self.pseudocost_branching(node,solution,original_fractional_vars,working_model,active_mgr)
 
     def strong_branching(self,node,solution,selected_vars,working_model,active_path):
+        if self.pool is not None and len(selected_vars) > 1:
+            return self.parallel_strong_branching(node,solution,selected_vars,working_model,active_path)
         best_var = None
         best_score = -float('inf')
         best_down_node=None
@@ -94,7 +106,7 @@ class Branching:
                 best_delta_down, best_delta_up = delta_down, delta_up
                 break
 
-            score=max(delta_down,10^-6)*max(delta_up,10^-6)
+            score=max(delta_down,1e-6)*max(delta_up,1e-6)
             self.score[var_idx]=score
 
             # 6. Keep track of the best variable with the best score
@@ -105,51 +117,154 @@ class Branching:
                 best_delta_down, best_delta_up = delta_down, delta_up
 
         if best_var is not None:
-            val=solution[best_var]
-            floor_val=int(val)
-            ceil_val=floor_val+1
-            f_down=val-floor_val
-            f_up=ceil_val-val
-
-            if f_down>1e-6 and best_delta_down<float('inf'):
-                self.pseudocosts_down[best_var]+=best_delta_down/f_down
-                self.pseudocounts_down[best_var]+=1
-
-            if f_up>1e-6 and best_delta_up<float('inf'):
-                self.pseudocosts_up[best_var]+=best_delta_up/f_up
-                self.pseudocounts_up[best_var]+=1
+            self._update_strong_pseudocosts(best_var,solution[best_var],best_delta_down,best_delta_up)
 
         active_path.switch_focus(original_focus, working_model)
         return best_var, best_down_node, best_up_node
 
-    def pseudocost_branching(self,node,solution,fractional_vars,working_model,active_path):
+    def parallel_strong_branching(self,node,solution,selected_vars,working_model,active_path):
+        """
+        Strong branching with the candidate child LPs solved by the worker pool. Results are
+        scanned in candidate order exactly like the serial loop, so the branching decision and
+        the pseudocost updates do not depend on the number of workers; only the two children
+        of the chosen variable are then solved again on the working model.
+        """
+        candidates=[]
+        for var_idx in selected_vars:
+            floor_val=int(solution[var_idx])
+            candidates.append((var_idx,(self.instance.lb[var_idx],floor_val),(floor_val+1,self.instance.ub[var_idx])))
+        basis=[b.tolist() for b in node.lp_basis] if node.lp_basis else None
+        objs=self.pool.solve_children(working_model,basis,candidates)
+
         best_var = None
         best_score = -float('inf')
-        avg_up = self.avgg(self.pseudocosts_up, self.pseudocounts_up)
-        avg_down = self.avgg(self.pseudocosts_down, self.pseudocounts_down)
-
-        original_focus = active_path.focus  # Save current focus to restore later
-
-        for var_idx, frac_value in fractional_vars:
-            val=solution[var_idx]
-            floor_val=int(val)
-            ceil_val=floor_val+1
+        for (var_idx,down_bounds,up_bounds),(obj_down,obj_up) in zip(candidates,objs):
+            obj_down = node.bound if obj_down is None else obj_down
+            obj_up = node.bound if obj_up is None else obj_up
+            delta_down=obj_down-node.bound
+            delta_up=obj_up-node.bound
+            if obj_up==float('inf') or obj_down==float('inf'):
+                best_var, best_down_bounds, best_up_bounds = var_idx, down_bounds, up_bounds
+                best_delta_down, best_delta_up = delta_down, delta_up
+                break
+            score=max(delta_down,1e-6)*max(delta_up,1e-6)
+            self.score[var_idx]=score
+            if score>best_score:
+                best_score=score
+                best_var, best_down_bounds, best_up_bounds = var_idx, down_bounds, up_bounds
+                best_delta_down, best_delta_up = delta_down, delta_up
 
-            f_down=val-floor_val
-            f_up=ceil_val-val
+        if best_var is None:
+            return None, None, None
+        self._update_strong_pseudocosts(best_var,solution[best_var],best_delta_down,best_delta_up)
 
-            # Use historical data or the global average to estimate degradation
-            ksi_down = (self.pseudocosts_down[var_idx] / self.pseudocounts_down[var_idx]) if self.pseudocounts_down[var_idx] > 0 else avg_down
-            ksi_up = (self.pseudocosts_up[var_idx] / self.pseudocounts_up[var_idx]) if self.pseudocounts_up[var_idx] > 0 else avg_up
+        original_focus = active_path.focus
+        best_down_node=Node(parent=node,bound_changes={best_var:best_down_bounds},depth=node.depth+1)
+        active_path.switch_focus(best_down_node, working_model)
+        best_down_node.evaluate_lp(working_model,self.instance)
+        best_up_node=Node(parent=node,bound_changes={best_var:best_up_bounds},depth=node.depth+1)
+        active_path.switch_focus(best_up_node, working_model)
+        best_up_node.evaluate_lp(working_model,self.instance)
+        active_path.switch_focus(original_focus, working_model)
+        return best_var, best_down_node, best_up_node
 
-            score=max(f_down*ksi_down,1e-6)*max(f_up*ksi_up,1e-6)
+    def _update_strong_pseudocosts(self,var_idx,val,delta_down,delta_up):
+        floor_val=int(val)
+        ceil_val=floor_val+1
+        f_down=val-floor_val
+        f_up=ceil_val-val
+
+        if f_down>1e-6 and delta_down<float('inf'):
+            self.avg_sum_down+=self._add_pseudocost(self.pseudocosts_down,self.pseudocounts_down,var_idx,delta_down/f_down)
+
+        if f_up>1e-6 and delta_up<float('inf'):
+            self.avg_sum_up+=self._add_pseudocost(self.pseudocosts_up,self.pseudocounts_up,var_idx,delta_up/f_up)
+
+    @staticmethod
+    def _add_pseudocost(costs,counts,var_idx,gain):
+        """Records one observed unit gain and returns the change of the variable's average pseudocost."""
+        old_avg=costs[var_idx]/counts[var_idx] if counts[var_idx]>0 else 0.0
+        costs[var_idx]+=gain
+        counts[var_idx]+=1
+        return costs[var_idx]/counts[var_idx]-old_avg
+
+    def average_pseudocosts(self):
+        """Global average pseudocosts (down, up) over the initialized variables, 1 if there are none."""
+        num_down=np.count_nonzero(self.pseudocounts_down)
+        num_up=np.count_nonzero(self.pseudocounts_up)
+        avg_down=self.avg_sum_down/num_down if num_down else 1
+        avg_up=self.avg_sum_up/num_up if num_up else 1
+        return avg_down, avg_up
+
+    def unit_pseudocosts(self,var_idxs):
+        """Average objective degradation per unit change (down, up) of each variable of var_idxs."""
+        avg_down, avg_up = self.average_pseudocosts()
+        counts_down=self.pseudocounts_down[var_idxs]
+        counts_up=self.pseudocounts_up[var_idxs]
+        # Use historical data or the global average to estimate degradation
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ksi_down=np.where(counts_down>0,self.pseudocosts_down[var_idxs]/counts_down,avg_down)
+            ksi_up=np.where(counts_up>0,self.pseudocosts_up[var_idxs]/counts_up,avg_up)
+        return ksi_down, ksi_up
+
+    def pseudocost_scores(self,var_idxs,vals):
+        """Product scores of branching on each variable of var_idxs at the given LP values."""
+        f_down=vals-np.floor(vals)
+        f_up=1-f_down
+        ksi_down, ksi_up = self.unit_pseudocosts(var_idxs)
+        return np.maximum(f_down*ksi_down,1e-6)*np.maximum(f_up*ksi_up,1e-6)
+
+    def save_history(self,path):
+        """
+        Writes the branching history (pseudocosts, pseudocounts and strong branching scores)
+        keyed by variable name to a compressed .npz file, for warm starting later runs.
+        """
+        num_vars=len(self.score)
+        with open(path,'wb') as f: #A file object keeps numpy from appending .npz to the path
+            np.savez_compressed(f,
+                                var_names=np.array(self.instance.var_names[:num_vars]),
+                                pseudocosts_up=self.pseudocosts_up,
+                                pseudocosts_down=self.pseudocosts_down,
+                                pseudocounts_up=self.pseudocounts_up,
+                                pseudocounts_down=self.pseudocounts_down,
+                                score=self.score)
+
+    def load_history(self,path):
+        """
+        Loads a history written by save_history. Variables are matched by name, so the file
+        may come from a structurally similar instance; unknown names are ignored.
+        Returns the number of variables that were matched.
+        """
+        with np.load(path) as history:
+            position={name: j for j, name in enumerate(self.instance.var_names[:len(self.score)])}
+            matches=[(k, position[name]) for k, name in enumerate(history['var_names'].tolist()) if name in position]
+            if not matches:
+                return 0
+            src, dst = (np.array(idx) for idx in zip(*matches))
+            self.pseudocosts_up[dst]=history['pseudocosts_up'][src]
+            self.pseudocosts_down[dst]=history['pseudocosts_down'][src]
+            self.pseudocounts_up[dst]=history['pseudocounts_up'][src]
+            self.pseudocounts_down[dst]=history['pseudocounts_down'][src]
+            self.score[dst]=history['score'][src]
+        self._reset_average_pseudocosts()
+        return len(matches)
+
+    def _reset_average_pseudocosts(self):
+        up=self.pseudocounts_up>0
+        down=self.pseudocounts_down>0
+        self.avg_sum_up=float(np.sum(self.pseudocosts_up[up]/self.pseudocounts_up[up]))
+        self.avg_sum_down=float(np.sum(self.pseudocosts_down[down]/self.pseudocounts_down[down]))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
 
-            if score>best_score:
-                best_score=score
-                best_var=var_idx
+    def pseudocost_branching(self,node,solution,fractional_vars,working_model,active_path):
+        original_focus = active_path.focus  # Save current focus to restore later
 
-        if best_var == None:
-            best_var = max(fractional_vars, key=lambda item: 0.5 - abs(item[1] - 0.5))[0]
+        var_idxs=np.array([i for i, _ in fractional_vars])
+        scores=self.pseudocost_scores(var_idxs,solution[var_idxs])
+        best_var=int(var_idxs[np.argmax(scores)]) #First best score, as in candidate order
 
         var_idx=best_var
         val=solution[var_idx]
@@ -175,6 +290,84 @@ class Branching:
         return best_var, best_down, best_up
 
 
-    def avgg(self,costs,counts):
-        values=[costs[i] / counts[i] for i in range(len(costs)) if counts[i]>0]
-        return sum(values) / len(values) if values else 1
+    def reliability_branching(self,node,solution,fractional_vars,working_model,active_path):
+        """
+        Candidates are ranked by pseudocost score. Those whose pseudocounts are below the
+        reliability threshold get their score from strong branching instead, with child LPs
+        cut off after sb_iter_limit dual simplex iterations (the dual bound reached is still a
+        valid estimate). The loop stops after `lookahead` strong branchings without a better
+        candidate, and the children of the chosen variable are reused when they were solved.
+        """
+        original_focus = active_path.focus
+
+        var_idxs=np.array([i for i, _ in fractional_vars])
+        scores=self.pseudocost_scores(var_idxs,solution[var_idxs])
+        order=np.lexsort((-var_idxs,-scores)) #Descending score, ties to the higher index
+        ranked=list(zip(scores[order].tolist(),var_idxs[order].tolist()))
+
+        best_score, best_var = ranked[0]
+        children={} #var_idx -> (down, up, down solved, up solved)
+        no_improvement=0
+        old_iter_limit, old_method = working_model.Params.IterationLimit, working_model.Params.Method
+        working_model.Params.IterationLimit = self.sb_iter_limit
+        working_model.Params.Method = 1
+        try:
+            for pc_score, var_idx in ranked:
+                if min(self.pseudocounts_down[var_idx], self.pseudocounts_up[var_idx]) >= self.reliability:
+                    if pc_score>best_score:
+                        best_score, best_var = pc_score, var_idx
+                    continue
+                if no_improvement >= self.lookahead:
+                    break
+                val=solution[var_idx]
+                floor_val=int(val)
+                down, obj_down, down_solved = self._limited_child(node, var_idx, (self.instance.lb[var_idx], floor_val), working_model, active_path)
+                up, obj_up, up_solved = self._limited_child(node, var_idx, (floor_val+1, self.instance.ub[var_idx]), working_model, active_path)
+                children[var_idx]=(down, up, down_solved, up_solved)
+                delta_down=obj_down-node.bound
+                delta_up=obj_up-node.bound
+                self._update_strong_pseudocosts(var_idx, val, delta_down if down_solved else float('inf'),
+                                                delta_up if up_solved else float('inf'))
+                if down.is_infeasible or up.is_infeasible:
+                    best_var=var_idx
+                    break
+                score=max(delta_down,1e-6)*max(delta_up,1e-6)
+                self.score[var_idx]=score
+                if score>best_score:
+                    best_score, best_var = score, var_idx
+                    no_improvement=0
+                else:
+                    no_improvement+=1
+        finally:
+            working_model.Params.IterationLimit = old_iter_limit
+            working_model.Params.Method = old_method
+
+        val=solution[best_var]
+        floor_val=int(val)
+        down, up, down_solved, up_solved = children.get(best_var, (None, None, False, False))
+        if not down_solved:
+            down=Node(parent=node,bound_changes={best_var:(self.instance.lb[best_var],floor_val)},depth=node.depth+1)
+            active_path.switch_focus(down, working_model)
+            down.evaluate_lp(working_model, self.instance)
+        if not up_solved:
+            up=Node(parent=node,bound_changes={best_var:(floor_val+1,self.instance.ub[best_var])},depth=node.depth+1)
+            active_path.switch_focus(up, working_model)
+            up.evaluate_lp(working_model, self.instance)
+        active_path.switch_focus(original_focus, working_model)
+        return best_var, down, up
+
+    def _limited_child(self,node,var_idx,bounds,working_model,active_path):
+        """
+        Solves a child LP under the iteration limit currently set on the model. Returns the
+        child, its bound and whether the LP was solved (the child is then fully evaluated).
+        """
+        child=Node(parent=node,bound_changes={var_idx:bounds},depth=node.depth+1)
+        active_path.switch_focus(child, working_model)
+        working_model.optimize()
+        if working_model.Status in (GRB.OPTIMAL, GRB.INFEASIBLE):
+            child.evaluate_lp(working_model, self.instance)
+            return child, child.bound, True
+        try:
+            return child, working_model.ObjVal, False
+        except gp.GurobiError:
+            return child, node.bound, False
@@ -0,0 +1,100 @@
+import os
+import numpy as np
+import gurobipy as gp
+from gurobipy import GRB
+
+from bnb.node import Node, model_vars
+
+
+def save_checkpoint(path, solver, nodes, working_model, num_base_rows, node_counter, elapsed,
+                    times, primal_bounds, dual_bounds):
+    """
+    Writes the search state to a compressed .npz file: the open nodes as bound and depth
+    plus their accumulated bound changes (CSR-like, one slice per node), the incumbent,
+    the branching history, the cuts added to the working model and the statistics.
+    The file is written next to `path` first and then renamed, so an interrupted write
+    never destroys the previous checkpoint.
+    """
+    changes = [node.accumulated_bounds() for node in nodes]
+    node_ptr = np.cumsum([0] + [len(change) for change in changes])
+    change_vars = [var for change in changes for var in change]
+    change_bounds = [bounds for change in changes for bounds in change.values()]
+
+    cut_rows = working_model.getA().tocsr()[num_base_rows:]
+    cut_constrs = working_model.getConstrs()[num_base_rows:]
+    brancher = solver.brancher
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f,
+                            num_vars=solver.instance.num_vars,
+                            node_bounds=np.array([node.bound for node in nodes], dtype=float),
+                            node_depths=np.array([node.depth for node in nodes], dtype=int),
+                            node_ptr=node_ptr,
+                            change_vars=np.array(change_vars, dtype=int),
+                            change_bounds=np.array(change_bounds, dtype=float).reshape(-1, 2),
+                            best_obj=solver.best_obj,
+                            best_sol=np.array([] if solver.best_sol is None else solver.best_sol, dtype=float),
+                            pseudocosts_up=brancher.pseudocosts_up,
+                            pseudocosts_down=brancher.pseudocosts_down,
+                            pseudocounts_up=brancher.pseudocounts_up,
+                            pseudocounts_down=brancher.pseudocounts_down,
+                            score=brancher.score,
+                            cut_indptr=cut_rows.indptr,
+                            cut_indices=cut_rows.indices,
+                            cut_data=cut_rows.data,
+                            cut_rhs=np.array(working_model.getAttr("RHS", cut_constrs), dtype=float),
+                            cut_sense=np.array(working_model.getAttr("Sense", cut_constrs), dtype='U1'),
+                            node_counter=node_counter,
+                            elapsed=elapsed,
+                            times=np.array(times, dtype=float),
+                            primal_bounds=np.array([np.nan if v is None else v for v in primal_bounds], dtype=float),
+                            dual_bounds=np.array(dual_bounds, dtype=float))
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path, solver, root, working_model):
+    """
+    Restores a checkpoint written by save_checkpoint into `solver`: adds the saved cuts to
+    the working model and to the cut pool of the solver, if any, and rebuilds the open nodes
+    as children of `root` carrying their whole bound-change path. Returns (nodes,
+    node_counter, elapsed, times, primal_bounds, dual_bounds).
+    """
+    with np.load(path) as state:
+        if int(state['num_vars']) != solver.instance.num_vars:
+            raise Exception(f"Checkpoint {path} was written for {int(state['num_vars'])} variables, "
+                            f"the model has {solver.instance.num_vars}")
+        variables = model_vars(working_model)
+        cut_indptr, cut_indices, cut_data = state['cut_indptr'], state['cut_indices'], state['cut_data']
+        senses = {'<': GRB.LESS_EQUAL, '>': GRB.GREATER_EQUAL, '=': GRB.EQUAL}
+        cut_pool = getattr(solver, 'cut_pool', None)
+        for k, (rhs, sense) in enumerate(zip(state['cut_rhs'], state['cut_sense'])):
+            row = slice(cut_indptr[k], cut_indptr[k + 1])
+            expr = gp.LinExpr(cut_data[row].tolist(), [variables[j] for j in cut_indices[row]])
+            constr = working_model.addLConstr(expr, senses[str(sense)], float(rhs))
+            if cut_pool is not None:
+                # The pool must know the row so it neither separates the cut again nor misses aging it
+                cut_pool.register(cut_indices[row].tolist(), constr)
+        working_model.update()
+
+        nodes = []
+        node_ptr, change_vars, change_bounds = state['node_ptr'], state['change_vars'], state['change_bounds']
+        for k, (bound, depth) in enumerate(zip(state['node_bounds'], state['node_depths'])):
+            path_changes = range(node_ptr[k], node_ptr[k + 1])
+            node = Node(parent=root, depth=int(depth),
+                        bound_changes={int(change_vars[c]): tuple(change_bounds[c]) for c in path_changes})
+            node.bound = float(bound)
+            node.fork_parent = root
+            nodes.append(node)
+
+        solver.best_obj = float(state['best_obj'])
+        solver.best_sol = state['best_sol'] if len(state['best_sol']) else None
+        brancher = solver.brancher
+        brancher.pseudocosts_up[:] = state['pseudocosts_up']
+        brancher.pseudocosts_down[:] = state['pseudocosts_down']
+        brancher.pseudocounts_up[:] = state['pseudocounts_up']
+        brancher.pseudocounts_down[:] = state['pseudocounts_down']
+        brancher.score[:] = state['score']
+        brancher._reset_average_pseudocosts()
+        primal_bounds = [None if np.isnan(v) else float(v) for v in state['primal_bounds']]
+        return (nodes, int(state['node_counter']), float(state['elapsed']), state['times'].tolist(),
+                primal_bounds, state['dual_bounds'].tolist())
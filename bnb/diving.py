@@ -0,0 +1,154 @@
+import numpy as np
+from gurobipy import GRB
+
+from bnb.node import model_vars, model_constrs
+
+# Variable selection rules of the dives, in the order they take turns
+DIVING_RULES = ('fractional', 'coefficient', 'pseudocost', 'guided', 'vectorlength')
+
+
+class DivingHeuristics:
+    """
+    Diving heuristics on a private copy of the working LP. A dive starts from the LP of a node,
+    repeatedly bounds one fractional variable chosen by a selection rule and re-solves, until
+    the LP solution is integral (or can be rounded without breaking a row), infeasible or worse
+    than the incumbent. When a bound change makes the LP infeasible or cuts it off, the dive
+    backtracks once by trying the other direction on the same variable. Dives create no tree nodes and leave the
+    working model and its warm start untouched. All dives together may spend lp_quot times the
+    simplex iterations of the tree search, plus lp_offset.
+    """
+    def __init__(self, instance, brancher, down_locks, up_locks, rules=DIVING_RULES, lp_quot=0.05,
+                 lp_offset=1000, max_depth=2000):
+        self.instance = instance
+        self.brancher = brancher
+        self.down_locks = down_locks
+        self.up_locks = up_locks
+        self.num_dive_vars = len(down_locks) #Complements added for clique cuts are not dived on
+        self.column_lengths = np.diff(instance.A_csc.indptr)[:self.num_dive_vars]
+        self.rules = rules
+        self.lp_quot = lp_quot
+        self.lp_offset = lp_offset
+        self.max_depth = max_depth
+        self.model = None #Dive LP, a copy of the working model
+        self.lp_iterations = 0 #Simplex iterations of all dives so far
+
+    def available_rules(self, has_incumbent):
+        """Rules a dive can use now; guided diving needs an incumbent."""
+        return [rule for rule in self.rules if has_incumbent or rule != 'guided']
+
+    def budget(self, tree_lp_iterations):
+        """Simplex iterations the next dive may spend."""
+        return self.lp_quot * tree_lp_iterations + self.lp_offset - self.lp_iterations
+
+    def _sync(self, working_model, node):
+        # The dive LP is copied again once cuts were added to the working model
+        if self.model is None or self.model.NumConstrs != working_model.NumConstrs:
+            self.model = working_model.copy()
+            self.model.setParam("OutputFlag", 0)
+        variables = model_vars(working_model)
+        dive_vars = model_vars(self.model)
+        self.model.setAttr("LB", dive_vars, working_model.getAttr("LB", variables))
+        self.model.setAttr("UB", dive_vars, working_model.getAttr("UB", variables))
+        if node.lp_basis:
+            v_basis, c_basis = node.lp_basis
+            constrs = model_constrs(self.model)
+            if len(v_basis) == len(dive_vars) and len(c_basis) == len(constrs):
+                self.model.setAttr("VBasis", dive_vars, v_basis.tolist())
+                self.model.setAttr("CBasis", constrs, c_basis.tolist())
+
+    def dive(self, node, working_model, rule, incumbent, cutoff, tree_lp_iterations):
+        """
+        Dives from `node`, whose LP must be the one working_model currently holds, with the
+        given selection rule. `incumbent` guides the guided rule and `cutoff` ends dives whose
+        LP bound reaches it. Returns (objective, solution) or (None, None).
+        """
+        budget = self.budget(tree_lp_iterations)
+        if budget <= 0 or node.solution is None or rule is None:
+            return None, None
+        self._sync(working_model, node)
+        model = self.model
+        variables = model_vars(model)
+        lb = np.array(model.getAttr("LB", variables))
+        ub = np.array(model.getAttr("UB", variables))
+        x = node.solution
+        for depth in range(self.max_depth):
+            fractional = self.instance.integer_infeasibilities(x)
+            if len(fractional) == 0:
+                return np.dot(self.instance.obj, x) + self.instance.obj_const, x
+            fractional = fractional[fractional < self.num_dive_vars]
+            if len(fractional) == 0:
+                return None, None
+            rounded = self._lock_rounding(x, fractional)
+            if rounded is not None:
+                return np.dot(self.instance.obj, rounded) + self.instance.obj_const, rounded
+
+            var_idx, up = self._select(rule, x, fractional, incumbent)
+            val = x[var_idx]
+            # Single-step backtracking: the other direction if the preferred one fails
+            for direction in (up, not up):
+                new_lb, new_ub = (np.ceil(val), ub[var_idx]) if direction else (lb[var_idx], np.floor(val))
+                var = variables[var_idx]
+                var.LB, var.UB = new_lb, new_ub
+                model.setParam("IterationLimit", max(budget, 0))
+                model.optimize()
+                self.lp_iterations += model.IterCount
+                budget -= model.IterCount
+                if model.Status == GRB.OPTIMAL and model.ObjVal < cutoff:
+                    break
+                if model.Status not in (GRB.OPTIMAL, GRB.INFEASIBLE):
+                    return None, None
+            else:
+                return None, None
+            lb[var_idx], ub[var_idx] = new_lb, new_ub
+            x = np.array(model.getAttr("X", variables))
+        return None, None
+
+    def _lock_rounding(self, x, fractional):
+        """
+        Rounds every fractional variable in a direction without locks, if there is one for all.
+        The locks only cover the rows the solver started with (not e.g. the complement links
+        of clique cuts), so the rounded point is checked against every row before it is used.
+        """
+        down_free = self.down_locks[fractional] == 0
+        up_free = self.up_locks[fractional] == 0
+        if not np.all(down_free | up_free):
+            return None
+        rounded = x.copy()
+        rounded[fractional] = np.where(down_free, np.floor(x[fractional]), np.ceil(x[fractional]))
+        if self.instance.row_violations(rounded)[0] > 1e-6 or not self.instance.is_integral(rounded):
+            return None
+        return rounded
+
+    def _select(self, rule, x, fractional, incumbent):
+        """(variable, round up?) of the dive step according to `rule`."""
+        vals = x[fractional]
+        f = vals - np.floor(vals)
+        if rule == 'guided' and incumbent is not None:
+            # Towards the incumbent, on the variable closest to its incumbent value
+            target = np.asarray(incumbent)[fractional]
+            k = np.argmin(np.abs(vals - target))
+            return int(fractional[k]), bool(target[k] > vals[k])
+        if rule == 'coefficient':
+            # Direction with fewer locks, the variable with fewest locks in it, then the closest
+            down_locks, up_locks = self.down_locks[fractional], self.up_locks[fractional]
+            up = up_locks < down_locks
+            k = np.lexsort((np.where(up, 1 - f, f), np.minimum(down_locks, up_locks)))[0]
+            return int(fractional[k]), bool(up[k])
+        if rule == 'pseudocost':
+            # Cheaper direction by pseudocost, the variable whose other direction is most expensive
+            ksi_down, ksi_up = self.brancher.unit_pseudocosts(fractional)
+            cost_down, cost_up = f * ksi_down, (1 - f) * ksi_up
+            up = np.where(f > 0.7, True, np.where(f < 0.3, False, cost_up < cost_down))
+            score = np.where(up, cost_down / (1 + cost_up), cost_up / (1 + cost_down))
+            k = np.argmax(score)
+            return int(fractional[k]), bool(up[k])
+        if rule == 'vectorlength':
+            # Against the objective, cheapest per row the column appears in (set covering style)
+            obj = np.asarray(self.instance.obj, dtype=float)[fractional]
+            up = obj >= 0
+            delta = np.where(up, (1 - f) * obj, -f * obj)
+            k = np.argmin((delta + 1e-6) / (self.column_lengths[fractional] + 1))
+            return int(fractional[k]), bool(up[k])
+        # fractional: the least fractional variable, to its nearest integer
+        k = np.argmin(np.minimum(f, 1 - f))
+        return int(fractional[k]), bool(f[k] > 0.5)
@@ -0,0 +1,95 @@
+import numpy as np
+
+
+class HeuristicStats:
+    """Calls, incumbent improvements, seconds and simplex iterations spent by one heuristic (or one arm of it)."""
+    def __init__(self):
+        self.calls = 0
+        self.found = 0
+        self.time = 0.0
+        self.lp_iterations = 0
+
+    def add(self, seconds, lp_iterations, found):
+        self.calls += 1
+        self.found += int(found)
+        self.time += seconds
+        self.lp_iterations += int(lp_iterations)
+
+
+class HeuristicScheduler:
+    """
+    Decides when the primal heuristics run and with how much effort, from what their calls
+    so far cost and brought:
+    - a heuristic is due every freq nodes; freq starts at its base frequency, grows by
+      freq_growth after every call that did not improve the incumbent (up to max_freq_factor
+      times the base) and falls back to the base after a call that did;
+    - the effort (a factor on the heuristic's own limits) halves with every failed call in a
+      row, down to min_effort;
+    - a heuristic whose calls took more than time_quot of the solve time plus time_offset
+      seconds is not due until the solve catches up;
+    - the variants of a heuristic (the diving rules, RINS or local branching) are chosen by
+      UCB1 on their rate of incumbent improvements.
+    With adaptive=False the frequencies and efforts stay at their base and variants take turns.
+    """
+    def __init__(self, base_freqs, adaptive=True, freq_growth=1.5, max_freq_factor=8, time_quot=0.2,
+                 time_offset=5.0, min_effort=0.25):
+        self.base_freqs = dict(base_freqs)
+        self.adaptive = adaptive
+        self.freq_growth = freq_growth
+        self.max_freq_factor = max_freq_factor
+        self.time_quot = time_quot
+        self.time_offset = time_offset
+        self.min_effort = min_effort
+        self.freqs = {name: float(freq) for name, freq in self.base_freqs.items()}
+        self.last_call = {name: 0 for name in self.base_freqs} #Node of the last call
+        self.failures = {name: 0 for name in self.base_freqs} #Calls in a row without improvement
+        self.stats = {name: HeuristicStats() for name in self.base_freqs}
+        self.arm_stats = {} #(heuristic, variant) -> HeuristicStats
+
+    def due(self, name, node_counter, elapsed):
+        """Whether heuristic `name` should run at node `node_counter`, `elapsed` seconds into the solve."""
+        if node_counter - self.last_call[name] < self.freqs[name]:
+            return False
+        return not self.adaptive or self.stats[name].time <= self.time_quot * elapsed + self.time_offset
+
+    def effort(self, name):
+        if not self.adaptive:
+            return 1.0
+        return max(self.min_effort, 0.5 ** self.failures[name])
+
+    def select(self, name, arms):
+        """The variant of heuristic `name` to run next among `arms`."""
+        if not arms:
+            return None
+        stats = [self.arm_stats.get((name, arm)) for arm in arms]
+        calls = np.array([s.calls if s else 0 for s in stats], dtype=float)
+        if not self.adaptive:
+            return arms[int(np.argmin(calls))]
+        if np.any(calls == 0):
+            return arms[int(np.argmax(calls == 0))]
+        found = np.array([s.found for s in stats], dtype=float)
+        ucb = found / calls + np.sqrt(2 * np.log(calls.sum()) / calls)
+        return arms[int(np.argmax(ucb))]
+
+    def record(self, name, node_counter, seconds, lp_iterations, found, arm=None):
+        """Books one call of heuristic `name` (variant `arm`) and adapts its frequency."""
+        self.stats[name].add(seconds, lp_iterations, found)
+        if arm is not None:
+            self.arm_stats.setdefault((name, arm), HeuristicStats()).add(seconds, lp_iterations, found)
+        self.last_call[name] = node_counter
+        if found:
+            self.failures[name] = 0
+            self.freqs[name] = float(self.base_freqs[name])
+        elif self.adaptive:
+            self.failures[name] += 1
+            self.freqs[name] = min(self.freqs[name] * self.freq_growth, self.base_freqs[name] * self.max_freq_factor)
+
+    def summary(self):
+        print("Heuristic          calls  found     time   LP iters")
+        for name, stats in self.stats.items():
+            if not stats.calls:
+                continue
+            rows = [(name, stats)] + [(f"  {arm}", arm_stats) for (heuristic, arm), arm_stats in self.arm_stats.items()
+                                      if heuristic == name]
+            for label, row in rows:
+                print(f"{label:<18} {row.calls:5d}  {row.found:5d}  {row.time:6.2f}s  {row.lp_iterations:9d}")
@@ -0,0 +1,105 @@
+import io
+import contextlib
+import numpy as np
+
+from bnb.params import SolverParams
+from presolve.base import InfeasibleModel
+from presolve.pipeline import run_presolve
+
+
+class LargeNeighborhoodSearch:
+    """
+    Heuristics that search a neighborhood of the LP solution or of the incumbent by solving a
+    sub-MIP of the instance with a recursive BranchAndBoundSolver under a node and time budget:
+    - RENS fixes the integer variables with an integral LP value and restricts the others to
+      the floor and ceiling of their LP value;
+    - RINS fixes the integer variables on which the incumbent and the LP solution agree;
+    - local branching keeps the binaries within Hamming distance k of the incumbent.
+    The sub-MIP is presolved first, so the fixed variables leave it entirely. Its solutions are
+    mapped back by the postsolve of that presolve and checked against the full instance.
+    """
+    def __init__(self, solver):
+        self.solver = solver
+        self.lp_iterations = 0 #Simplex iterations of all sub-MIP searches so far
+
+    def run(self, method, lp_solution, time_left, effort=1.0):
+        """Runs 'rins' or 'local_branching'. Returns (objective, solution) or (None, None)."""
+        if method == 'rins':
+            return self.rins(lp_solution, time_left, effort)
+        return self.local_branching(time_left, effort)
+
+    def rens(self, lp_solution, time_left, effort=1.0):
+        instance = self.solver.instance
+        I = np.array(self.solver.I, dtype=int)
+        x = np.asarray(lp_solution, dtype=float)
+        if len(I) == 0:
+            return None, None
+        integral = np.abs(x[I] - np.round(x[I])) <= 1e-6
+        if integral.mean() < self.solver.params.lns_min_fixing_rate:
+            return None, None
+        lb = np.array(instance.lb, dtype=float)
+        ub = np.array(instance.ub, dtype=float)
+        fixed, free = I[integral], I[~integral]
+        lb[fixed] = ub[fixed] = np.round(x[fixed])
+        lb[free] = np.maximum(lb[free], np.floor(x[free]))
+        ub[free] = np.minimum(ub[free], np.ceil(x[free]))
+        return self._solve_sub_mip(instance.sub_instance(lb, ub), time_left, effort)
+
+    def rins(self, lp_solution, time_left, effort=1.0):
+        instance = self.solver.instance
+        incumbent = self.solver.best_sol
+        I = np.array(self.solver.I, dtype=int)
+        if incumbent is None or len(I) == 0:
+            return None, None
+        x = np.asarray(lp_solution, dtype=float)
+        incumbent = np.asarray(incumbent, dtype=float)
+        agree = np.abs(x[I] - incumbent[I]) <= 1e-6
+        if agree.mean() < self.solver.params.lns_min_fixing_rate:
+            return None, None
+        lb = np.array(instance.lb, dtype=float)
+        ub = np.array(instance.ub, dtype=float)
+        fixed = I[agree]
+        lb[fixed] = ub[fixed] = np.round(incumbent[fixed])
+        return self._solve_sub_mip(instance.sub_instance(lb, ub), time_left, effort)
+
+    def local_branching(self, time_left, effort=1.0):
+        instance = self.solver.instance
+        incumbent = self.solver.best_sol
+        B = np.array(self.solver.B, dtype=int)
+        if incumbent is None or len(B) == 0:
+            return None, None
+        ones = np.asarray(incumbent, dtype=float)[B] > 0.5
+        sub = instance.sub_instance(instance.lb, instance.ub)
+        # sum of (1 - x_j) over the binaries at 1 plus sum of x_j over those at 0 <= k
+        sub.add_row(B, np.where(ones, -1.0, 1.0), 'L', self.solver.params.lns_local_branching_k - ones.sum(),
+                    "local_branching")
+        return self._solve_sub_mip(sub, time_left, effort)
+
+    def _solve_sub_mip(self, sub, time_left, effort):
+        """`effort` scales the node and time limits of the search."""
+        solver = self.solver
+        params = solver.params
+        if time_left <= 0:
+            return None, None
+        sub_params = SolverParams(time_limit=min(effort * params.lns_time_limit, time_left),
+                                  node_limit=max(1, int(effort * params.lns_node_limit)), enable_lns=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                postsolve = run_presolve(sub).postsolve
+            except InfeasibleModel:
+                return None, None #The neighborhood is empty
+            sub_solver = type(solver)(sub, strong_depth=solver.strong_depth, strong_k=solver.strong_k, params=sub_params)
+            sub_solver.best_obj = solver.best_obj - 1e-6 #Only improving solutions are of interest
+            sub_solver.solve()
+        self.lp_iterations += sub_solver.tree_lp_iterations
+        if sub_solver.status == 'error':
+            raise Exception("Sub-MIP search failed")
+        if sub_solver.best_sol is None:
+            return None, None
+
+        instance = solver.instance
+        x = np.asarray(postsolve(sub_solver.best_sol), dtype=float)
+        if (instance.row_violations(x)[0] > 1e-6 or not instance.is_integral(x)
+                or np.any(x < instance.lb - 1e-6) or np.any(x > instance.ub + 1e-6)):
+            return None, None
+        return float(np.dot(instance.obj, x) + instance.obj_const), x
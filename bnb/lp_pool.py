@@ -0,0 +1,111 @@
+import os
+import tempfile
+import multiprocessing as mp
+import gurobipy as gp
+from gurobipy import GRB
+from bnb.node import model_vars
+
+# State of a worker process: its own Gurobi environment and the LP copy it last loaded
+_worker = {}
+
+
+def _init_worker():
+    env = gp.Env(empty=True)
+    env.setParam("OutputFlag", 0)
+    env.start()
+    _worker["env"] = env
+    _worker["path"] = None
+
+
+def _load_model(path):
+    if _worker["path"] != path:
+        model = gp.read(path, env=_worker["env"])
+        model.setParam("OutputFlag", 0)
+        model.setParam("Threads", 1)
+        _worker.update(path=path, model=model, vars=model.getVars(), constrs=model.getConstrs())
+    return _worker["model"], _worker["vars"], _worker["constrs"]
+
+
+def _solve_children(task):
+    """
+    Solves the down and up child LPs of each candidate of a chunk on the worker's LP copy,
+    starting every solve from the parent bounds (and basis, when given).
+    """
+    path, lb, ub, basis, candidates = task
+    model, variables, constrs = _load_model(path)
+    model.setAttr("LB", variables, lb)
+    model.setAttr("UB", variables, ub)
+    results = []
+    for var_idx, down_bounds, up_bounds in candidates:
+        var = variables[var_idx]
+        objs = []
+        for new_lb, new_ub in (down_bounds, up_bounds):
+            var.LB, var.UB = new_lb, new_ub
+            if basis is not None:
+                model.setAttr("VBasis", variables, basis[0])
+                model.setAttr("CBasis", constrs, basis[1])
+            model.optimize()
+            if model.Status == GRB.INFEASIBLE:
+                objs.append(float("inf"))
+            else:
+                # A child LP not solved to optimality (numerics, INF_OR_UNBD) gives no bound;
+                # the caller falls back to the parent's
+                objs.append(model.ObjVal if model.Status == GRB.OPTIMAL else None)
+        var.LB, var.UB = lb[var_idx], ub[var_idx]
+        results.append(tuple(objs))
+    return results
+
+
+class LPWorkerPool:
+    """
+    Pool of worker processes, each holding its own copy of the working LP in its own
+    Gurobi environment. The LP is shared through a model file that is rewritten whenever
+    rows (e.g. cuts) were added to the working model since the last export.
+    """
+    def __init__(self, num_workers):
+        self.num_workers = num_workers
+        self.pool = None
+        self.tmpdir = None
+        self.path = None
+        self.exported_constrs = None
+        self.version = 0
+
+    def _sync(self, model):
+        if self.pool is None:
+            self.tmpdir = tempfile.mkdtemp(prefix="bnb_lp_")
+            self.pool = mp.get_context("spawn").Pool(self.num_workers, initializer=_init_worker)
+        if self.exported_constrs != model.NumConstrs:
+            self.version += 1
+            self.path = os.path.join(self.tmpdir, f"lp_{self.version}.mps")
+            model.write(self.path)
+            self.exported_constrs = model.NumConstrs
+
+    def solve_children(self, model, basis, candidates):
+        """
+        Returns (obj_down, obj_up) for each (var_idx, (lb, ub) down, (lb, ub) up) candidate, in
+        candidate order, with the bounds `model` currently has as the parent bounds. An
+        objective is inf for an infeasible child and None for one not solved to optimality.
+        """
+        self._sync(model)
+        variables = model_vars(model)
+        lb = model.getAttr("LB", variables)
+        ub = model.getAttr("UB", variables)
+        chunk = -(-len(candidates) // self.num_workers)
+        tasks = [(self.path, lb, ub, basis, candidates[start:start + chunk])
+                 for start in range(0, len(candidates), chunk)]
+        results = []
+        for chunk_results in self.pool.map(_solve_children, tasks):
+            results.extend(chunk_results)
+        return results
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        if self.tmpdir is not None:
+            for name in os.listdir(self.tmpdir):
+                os.remove(os.path.join(self.tmpdir, name))
+            os.rmdir(self.tmpdir)
+            self.tmpdir = None
+            self.exported_constrs = None
@@ -1,38 +1,87 @@
 import gurobipy as gp
+import numpy as np
+
+
+def model_vars(model):
+    """
+    The variable list of `model`. getVars() builds a new list on every call, so it is
+    fetched once and cached on the model (Gurobi keeps user data in '_' attributes; the
+    names must not clash with gurobipy's own, e.g. Model._constrs).
+    """
+    if getattr(model, "_bnb_vars", None) is None:
+        model._bnb_vars = model.getVars()
+    return model._bnb_vars
+
+
+def model_constrs(model):
+    """The constraint list of `model`, refreshed when rows (e.g. cuts) were added."""
+    constrs = getattr(model, "_bnb_constrs", None)
+    if constrs is None or len(constrs) != model.NumConstrs:
+        model._bnb_constrs = model.getConstrs()
+    return model._bnb_constrs
+
+
 class Node:
+    __slots__ = ("parent", "bound_changes", "depth", "node_number", "bound", "solution", "reduced_costs",
+                 "fractional", "status", "is_infeasible", "is_integer", "open_children", "active", "node_type",
+                 "fork_parent", "processed", "lp_basis")
+
     def __init__(self, parent=None,depth=0, bound_changes=None,node_number=0):
         self.parent = parent
-        self.bound_changes = bound_changes or {}  # e.g., {i: (lb, ub)}
+        # Delta to the parent LP as (var, lb, ub) triples, e.g. given as {i: (lb, ub)}
+        self.bound_changes = tuple((var, lb, ub) for var, (lb, ub) in (bound_changes or {}).items())
         self.depth = depth
         self.node_number = node_number
 
         # BnB state
         self.bound=None #LP objective value
-        self.solution = None #List of variable values (solutions of relaxation)
+        self.solution = None #Array of variable values (solutions of relaxation)
+        self.reduced_costs = None #Array of reduced costs of the relaxation
+        self.fractional = None #Indices of integer variables with a fractional value
         self.status=None #Gurobi solver status
         self.is_infeasible = False
         self.is_integer = False
 
         # Tree structure
-        self.children = []
+        self.open_children = 0 #Children whose subtree is still open
         self.active = True
         self.node_type='unprocessed' # One of: focusnode, child, sibling, leaf, fork, junction
         self.fork_parent=None
         self.processed = False
 
-        # Basis storage
+        # Basis storage, (VBasis, CBasis) as int8 arrays
         self.lp_basis=None
 
     def accumulated_bounds(self):
         bounds = {}
         node=self
         while node:
-            for var, (lb,ub) in node.bound_changes.items():
+            for var, lb, ub in node.bound_changes:
                 if var not in bounds:
                     bounds[var] = (lb,ub)
             node=node.parent
         return bounds
 
+    def release_lp_data(self, keep_basis=False):
+        """Drops the LP solution (and the basis unless keep_basis) once nothing needs it anymore."""
+        self.solution = None
+        self.reduced_costs = None
+        self.fractional = None
+        if not keep_basis:
+            self.lp_basis = None
+
+    def attach_children(self, children):
+        """
+        Registers the children created by branching on this node. Open children only keep
+        their bound: they are re-solved from the basis of the nearest fork when selected.
+        """
+        fork = self if self.lp_basis else self.fork_parent
+        for child in children:
+            child.release_lp_data()
+            child.fork_parent = fork
+        self.open_children = sum(1 for child in children if not child.is_infeasible)
+        self.release_lp_data(keep_basis=True)
+
     def evaluate_lp(self,model,instance):
         model.optimize()
         self.status=model.Status
@@ -41,17 +90,18 @@ class Node:
             self.bound=float("inf")
             return
         self.bound=model.ObjVal
-        self.solution=[var.X for var in model.getVars()]
-        self.is_integer=all(
-            abs(self.solution[i]-round(self.solution[i])) <1e-6
-            for i, vtype in enumerate(instance.var_types)
-            if vtype in ['B','I']
-        )
+        variables=model_vars(model)
+        self.solution=np.array(model.getAttr("X",variables))
+        self.reduced_costs=np.array(model.getAttr("RC",variables))
+        int_mask=instance.integer_mask
+        fractionality=np.abs(self.solution-np.round(self.solution))
+        self.fractional=np.flatnonzero(int_mask & (fractionality>1e-6))
+        self.is_integer=len(self.fractional)==0
         try:
-            v_basis=model.getAttr("VBasis")
-            c_basis=model.getAttr("CBasis")
+            v_basis=np.array(model.getAttr("VBasis",variables),dtype=np.int8)
+            c_basis=np.array(model.getAttr("CBasis",model_constrs(model)),dtype=np.int8)
             self.lp_basis=(v_basis,c_basis)
         except gp.GurobiError:
             self.lp_basis=None
 
-        self.fork_parent=self if self.lp_basis else (self.parent.fork_parent if self.parent else None)
\ No newline at end of file
+        self.fork_parent=self if self.lp_basis else (self.parent.fork_parent if self.parent else None)
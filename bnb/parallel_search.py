@@ -0,0 +1,276 @@
+import os
+import time
+import queue as queue_module
+import heapq
+import tempfile
+import itertools
+import multiprocessing as mp
+from types import SimpleNamespace
+import numpy as np
+from gurobipy import GRB
+
+from bnb.branching import Branching
+from bnb.node import Node
+from bnb.lp_pool import _init_worker, _load_model
+
+
+def _tree_worker(setup, tasks, results, incumbent):
+    """
+    Worker loop of the parallel tree search. Each task is an open node given by its
+    accumulated bound changes; the worker solves its LP on its own copy of the working
+    model and sends back either the final status of the node or its two children.
+    Branching uses pseudocosts learned locally, seeded with those of the root.
+    """
+    _init_worker()
+    model, variables, _constrs = _load_model(setup['path'])
+    root_lb, root_ub = setup['lb'], setup['ub']
+    model.setAttr("LB", variables, root_lb.tolist())
+    model.setAttr("UB", variables, root_ub.tolist())
+    int_mask = setup['int_mask']
+    brancher = Branching(SimpleNamespace(num_vars=len(root_lb), var_names=[], lb=root_lb, ub=root_ub))
+    # The solver's pseudocosts only cover the original variables, not the complements added for clique cuts
+    num_seeded = len(setup['pseudocosts_up'])
+    brancher.pseudocosts_up[:num_seeded] = setup['pseudocosts_up']
+    brancher.pseudocosts_down[:num_seeded] = setup['pseudocosts_down']
+    brancher.pseudocounts_up[:num_seeded] = setup['pseudocounts_up']
+    brancher.pseudocounts_down[:num_seeded] = setup['pseudocounts_down']
+    brancher._reset_average_pseudocosts()
+    applied = {}
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        node_id, bound_changes, parent_bound, depth, branch = task
+        if parent_bound > incumbent.value:
+            results.put((node_id, 'pruned', parent_bound, depth, 0, None))
+            continue
+
+        # Move the LP from the previous node to this one with one bulk write per bound
+        target = {var: (lb, ub) for var, lb, ub in bound_changes}
+        changed = [var for var, bounds in target.items() if applied.get(var) != bounds]
+        restored = [var for var in applied if var not in target]
+        idxs = changed + restored
+        if idxs:
+            model.setAttr("LB", [variables[j] for j in idxs],
+                          [target[j][0] for j in changed] + [root_lb[j] for j in restored])
+            model.setAttr("UB", [variables[j] for j in idxs],
+                          [target[j][1] for j in changed] + [root_ub[j] for j in restored])
+        applied = target
+
+        model.optimize()
+        if model.Status == GRB.INFEASIBLE:
+            results.put((node_id, 'infeasible', float('inf'), depth, 0, None))
+            continue
+        if model.Status != GRB.OPTIMAL:
+            # INF_OR_UNBD, numerical trouble or a limit: the node goes back unresolved
+            results.put((node_id, 'error', parent_bound, depth, 0, model.Status))
+            continue
+        bound = model.ObjVal
+        x = np.array(model.getAttr("X", variables))
+        if branch is not None:
+            var_idx, val = branch
+            if bound < float('inf'):
+                down = target[var_idx][1] < val
+                delta = bound - parent_bound
+                brancher._update_strong_pseudocosts(var_idx, val, delta if down else float('inf'),
+                                                    float('inf') if down else delta)
+        if bound > incumbent.value:
+            results.put((node_id, 'pruned', bound, depth, 0, None))
+            continue
+
+        fractional = np.flatnonzero(int_mask & (np.abs(x - np.round(x)) > 1e-6))
+        if len(fractional) == 0:
+            results.put((node_id, 'integer', bound, depth, 0, x))
+            continue
+        candidates = fractional[fractional < setup['num_branch_vars']]
+        if len(candidates) == 0:
+            results.put((node_id, 'pruned', bound, depth, len(fractional), None))
+            continue
+        scores = brancher.pseudocost_scores(candidates, x[candidates])
+        var_idx = int(candidates[np.argmax(scores)])
+        val = x[var_idx]
+        lb, ub = target.get(var_idx, (root_lb[var_idx], root_ub[var_idx]))
+        others = tuple(change for change in bound_changes if change[0] != var_idx)
+        children = [(others + ((var_idx, lb, np.floor(val)),), (var_idx, val)),
+                    (others + ((var_idx, np.floor(val) + 1, ub),), (var_idx, val))]
+        results.put((node_id, 'branched', bound, depth, len(fractional), children))
+
+
+class ParallelTreeSearch:
+    """
+    Best-first branch-and-bound over a pool of worker processes. The coordinator keeps the
+    open nodes as (bound, accumulated bound changes) and hands them out to the workers,
+    each owning an LP copy in its own Gurobi environment. The incumbent value is shared
+    with the workers so they drop dominated nodes before solving them. Nodes the search does
+    not finish (time or node limit, an LP a worker could not solve, a worker that was killed)
+    are handed back to the tree, so the caller sees the true remaining tree. A worker failing
+    with an exception is raised as an error.
+    """
+    def __init__(self, solver, working_model, num_workers):
+        self.solver = solver
+        self.working_model = working_model
+        self.num_workers = num_workers
+
+    def _setup(self, path):
+        instance = self.solver.instance
+        brancher = self.solver.brancher
+        num_branch_vars = instance.original_num_vars if self.solver.enable_clique_cuts else instance.num_vars
+        return {'path': path,
+                'lb': np.asarray(instance.lb, dtype=float),
+                'ub': np.asarray(instance.ub, dtype=float),
+                'int_mask': instance.integer_mask,
+                'num_branch_vars': num_branch_vars,
+                'pseudocosts_up': brancher.pseudocosts_up,
+                'pseudocosts_down': brancher.pseudocosts_down,
+                'pseudocounts_up': brancher.pseudocounts_up,
+                'pseudocounts_down': brancher.pseudocounts_down}
+
+    def _as_nodes(self, root, entries):
+        """Nodes for (bound, bound changes, depth) entries, as children of `root` carrying their whole path."""
+        nodes = []
+        for bound, changes, depth in entries:
+            node = Node(parent=root, depth=depth, bound_changes={var: (lb, ub) for var, lb, ub in changes})
+            node.bound = bound
+            node.fork_parent = root
+            nodes.append(node)
+        return nodes
+
+    def _restore(self, tree, root, entries):
+        """Puts unfinished entries back into `tree` as children of `root`."""
+        nodes = self._as_nodes(root, entries)
+        if nodes:
+            root.attach_children(nodes)
+            for node in nodes:
+                tree.push(node)
+        return nodes
+
+    def _open_entries(self, queue, in_flight, unresolved):
+        """The (bound, bound changes, depth) of every node not finished yet and not dominated."""
+        entries = list(in_flight.values()) + unresolved
+        entries += [(bound, changes, depth) for bound, _node_id, changes, depth, _branch in queue]
+        return [entry for entry in entries if entry[0] <= self.solver.best_obj]
+
+    def run(self, tree, root, times, primal_bounds, dual_bounds, start_time, timeout, node_counter=0, checkpoint=None):
+        """
+        Drains `tree` into the coordinator queue and searches until the queue is exhausted,
+        the gap closes or the timeout hits. Updates the incumbent of the solver and appends
+        to the statistics lists like the serial loop. Unfinished nodes are put back into
+        `tree` as children of `root`. Counts on from `node_counter` (nodes explored before,
+        e.g. by a resumed run) and returns the new count. `checkpoint`,
+        if given, is called as checkpoint(open nodes, node_counter) every
+        solver.checkpoint_interval seconds.
+        """
+        solver = self.solver
+        counter = itertools.count()
+        queue = []
+        node = tree.pop_best_bound()
+        while node is not None:
+            changes = tuple((var, lb, ub) for var, (lb, ub) in node.accumulated_bounds().items())
+            heapq.heappush(queue, (node.bound, next(counter), changes, node.depth, None))
+            node = tree.pop_best_bound()
+
+        tmpdir = tempfile.mkdtemp(prefix="bnb_tree_")
+        path = os.path.join(tmpdir, "lp.mps")
+        self.working_model.write(path)
+        ctx = mp.get_context("spawn")
+        tasks, results = ctx.Queue(), ctx.Queue()
+        incumbent = ctx.Value('d', solver.best_obj, lock=False)
+        workers = []
+
+        in_flight = {} #node id -> (bound, bound changes, depth)
+        unresolved = [] #Nodes whose LP a worker could not solve
+        gap_closed = False
+        start_tree_time = time.time()
+        last_checkpoint = time.time()
+        try:
+            for _ in range(self.num_workers):
+                worker = ctx.Process(target=_tree_worker, args=(self._setup(path), tasks, results, incumbent), daemon=True)
+                worker.start()
+                workers.append(worker)
+            while queue or in_flight:
+                if time.time() - start_time > timeout:
+                    print("\n⏰ Timeout limit reached. Terminating search.")
+                    solver.status = 'timeout'
+                    break
+                if solver.params.node_limit is not None and node_counter >= solver.params.node_limit:
+                    print("\n Node limit reached. Terminating search.")
+                    solver.status = 'node_limit'
+                    break
+                if checkpoint is not None and time.time() - last_checkpoint > solver.checkpoint_interval:
+                    checkpoint(self._as_nodes(root, self._open_entries(queue, in_flight, unresolved)), node_counter)
+                    last_checkpoint = time.time()
+                while queue and len(in_flight) < 2 * self.num_workers:
+                    bound, node_id, changes, depth, branch = heapq.heappop(queue)
+                    if bound > solver.best_obj:
+                        continue
+                    tasks.put((node_id, changes, bound, depth, branch))
+                    in_flight[node_id] = (bound, changes, depth)
+                if not in_flight:
+                    continue
+
+                try:
+                    node_id, status, bound, depth, int_infeas, payload = results.get(timeout=1.0)
+                except queue_module.Empty:
+                    dead = [worker for worker in workers if not worker.is_alive()]
+                    if any(worker.exitcode > 0 for worker in dead):
+                        # An exception in the worker (its traceback went to stderr) is a bug, not a lost process
+                        raise Exception(f"Tree worker failed with exit code {max(worker.exitcode for worker in dead)}")
+                    if dead:
+                        print("\n A tree worker was killed. Handing the open nodes back to the serial search.")
+                        break
+                    continue
+                if status == 'error':
+                    print(f"    Node LP ended with status {payload}; handing it back to the serial search")
+                    unresolved.append(in_flight.pop(node_id))
+                    continue
+                del in_flight[node_id]
+                node_counter += 1
+                elapsed_time = time.time() - start_tree_time
+                found = status == 'integer' and bound < solver.best_obj
+                if found:
+                    solver.best_obj = bound
+                    solver.best_sol = payload
+                    solver.share_incumbent()
+                    incumbent.value = bound
+                    queue = [entry for entry in queue if entry[0] <= bound]
+                    heapq.heapify(queue)
+                elif status == 'branched':
+                    for changes, branch in payload:
+                        heapq.heappush(queue, (bound, next(counter), changes, depth + 1, branch))
+                else:
+                    continue
+
+                open_bounds = [entry[0] for entry in in_flight.values()] + [entry[0] for entry in unresolved]
+                open_bounds += [queue[0][0]] if queue else []
+                best_bound = min(open_bounds, default=solver.best_obj)
+                unexplored = len(queue) + len(in_flight) + len(unresolved)
+                if solver.best_sol is not None:
+                    gap_number = (solver.best_obj - best_bound) / max(1e-10, abs(solver.best_obj))
+                    incumbent_str = f"{solver.best_obj:10.5f}"
+                    gap_str = f"{gap_number*100:4.1f}%"
+                else:
+                    gap_number = None
+                    incumbent_str, gap_str = "     -     ", "  -  "
+                if found:
+                    print(f"P{node_counter:5d} {unexplored:5d}  |{bound:8.5f}  {depth:5d}      {int_infeas:6d}  |{incumbent_str}  {best_bound:8.5f}  {gap_str}  |  {elapsed_time:4.2f}s")
+                else:
+                    print(f"D{node_counter:5d} {unexplored:5d}  |   -      {depth:5d}      {int_infeas:6d}  |{incumbent_str}  {best_bound:8.5f}  {gap_str}  |  {elapsed_time:4.2f}s")
+                times.append(elapsed_time)
+                primal_bounds.append(solver.best_obj if solver.best_sol is not None else None)
+                dual_bounds.append(best_bound)
+                if found and solver.params.gap_closed(solver.best_obj, best_bound):
+                    gap_closed = True
+                    break
+        finally:
+            if not gap_closed:
+                self._restore(tree, root, self._open_entries(queue, in_flight, unresolved))
+            for _ in workers:
+                tasks.put(None)
+            for worker in workers:
+                worker.join(timeout=1)
+                if worker.is_alive():
+                    worker.terminate()
+            os.remove(path)
+            os.rmdir(tmpdir)
+        return node_counter
@@ -0,0 +1,129 @@
+from typing import Optional, Sequence
+
+from bnb.diving import DIVING_RULES
+
+
+class SolverParams:
+    """
+    Limits and heuristic settings of BranchAndBoundSolver.
+
+    time_limit:       seconds before the search stops (including root processing)
+    node_limit:       number of explored nodes before the search stops, None for no limit
+    abs_gap:          stop once incumbent - best bound <= abs_gap
+    rel_gap:          stop once (incumbent - best bound) / |incumbent| < rel_gap
+    open_node_limit:  memory budget as a number of open nodes; above it the solver selects
+                      nodes depth-first, which closes subtrees instead of opening new ones,
+                      until the tree shrinks below the budget again. None for no budget
+    enable_pump:      run the feasibility pump
+    pump_freq:        pump every pump_freq nodes while there is no incumbent
+    pump_freq_incumbent: pump every pump_freq_incumbent nodes once there is one
+    pump_max_iter:    iterations of one pump run
+    pump_alpha:       initial weight of the objective in the pump's projection, 0 for the
+                      plain distance pump
+    pump_alpha_decay: factor applied to the objective weight after every projection
+    pump_stall_iter:  pump iterations without a closer projection before the pump gives up
+    enable_diving:    run the diving heuristic
+    diving_freq:      dive every diving_freq nodes
+    diving_rules:     variable selection rules the dives choose from, see bnb.diving
+    diving_lp_quot:   simplex iterations of all dives as a fraction of those of the tree search
+    diving_lp_offset: simplex iterations the dives may spend on top of that
+    enable_lns:       run the large neighborhood search heuristics (RENS at the root, then RINS
+                      or local branching), see bnb.lns
+    lns_freq:         run RINS or local branching every lns_freq nodes once there is an incumbent
+    lns_node_limit:   node limit of a sub-MIP solve
+    lns_time_limit:   time limit of a sub-MIP solve in seconds
+    lns_min_fixing_rate: least fraction of the integer variables RENS and RINS must fix
+    lns_local_branching_k: Hamming distance to the incumbent local branching searches within
+    adaptive_heuristics: adapt the frequencies and efforts of the heuristics to their success,
+                      see bnb.heuristic_scheduler; the *_freq settings are the base frequencies
+    heuristic_freq_growth: factor on the frequency of a heuristic after a call without improvement
+    heuristic_max_freq_factor: largest multiple of its base frequency a heuristic can reach
+    heuristic_time_quot: fraction of the solve time each heuristic may spend
+    heuristic_time_offset: seconds each heuristic may spend on top of that
+    heuristic_min_effort: smallest factor on the limits of a heuristic after failed calls
+    max_cut_rounds:   separation rounds of clique cuts at the root
+    max_cuts_per_round: most efficacious violated cuts added to the LP per round
+    cut_max_age:      rounds a cut may stay slack before it is removed from the LP
+    cut_stall_rounds: stop separating once the root bound improved by less than a
+                      relative 1e-4 over this many rounds
+    node_cut_freq:    separate clique cuts at every node_cut_freq-th tree node, 0 to only
+                      separate at the root. Cuts added in the tree are not aged and stay in
+                      the LP for the rest of the search, hence off by default
+    """
+    def __init__(self,
+                 time_limit: float = 600,
+                 node_limit: Optional[int] = None,
+                 abs_gap: float = 1e-6,
+                 rel_gap: float = 1e-3,
+                 open_node_limit: Optional[int] = None,
+                 enable_pump: bool = True,
+                 pump_freq: int = 2,
+                 pump_freq_incumbent: int = 20,
+                 pump_max_iter: int = 10000,
+                 pump_alpha: float = 1.0,
+                 pump_alpha_decay: float = 0.5,
+                 pump_stall_iter: int = 20,
+                 enable_diving: bool = True,
+                 diving_freq: int = 15,
+                 diving_rules: Sequence[str] = DIVING_RULES,
+                 diving_lp_quot: float = 0.05,
+                 diving_lp_offset: int = 1000,
+                 enable_lns: bool = True,
+                 lns_freq: int = 100,
+                 lns_node_limit: int = 500,
+                 lns_time_limit: float = 10,
+                 lns_min_fixing_rate: float = 0.3,
+                 lns_local_branching_k: int = 10,
+                 adaptive_heuristics: bool = True,
+                 heuristic_freq_growth: float = 1.5,
+                 heuristic_max_freq_factor: float = 8,
+                 heuristic_time_quot: float = 0.2,
+                 heuristic_time_offset: float = 5.0,
+                 heuristic_min_effort: float = 0.25,
+                 max_cut_rounds: int = 20,
+                 max_cuts_per_round: int = 50,
+                 cut_max_age: int = 3,
+                 cut_stall_rounds: int = 3,
+                 node_cut_freq: int = 0):
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.abs_gap = abs_gap
+        self.rel_gap = rel_gap
+        self.open_node_limit = open_node_limit
+        self.enable_pump = enable_pump
+        self.pump_freq = pump_freq
+        self.pump_freq_incumbent = pump_freq_incumbent
+        self.pump_max_iter = pump_max_iter
+        self.pump_alpha = pump_alpha
+        self.pump_alpha_decay = pump_alpha_decay
+        self.pump_stall_iter = pump_stall_iter
+        self.enable_diving = enable_diving
+        self.diving_freq = diving_freq
+        self.diving_rules = tuple(diving_rules)
+        self.diving_lp_quot = diving_lp_quot
+        self.diving_lp_offset = diving_lp_offset
+        self.enable_lns = enable_lns
+        self.lns_freq = lns_freq
+        self.lns_node_limit = lns_node_limit
+        self.lns_time_limit = lns_time_limit
+        self.lns_min_fixing_rate = lns_min_fixing_rate
+        self.lns_local_branching_k = lns_local_branching_k
+        self.adaptive_heuristics = adaptive_heuristics
+        self.heuristic_freq_growth = heuristic_freq_growth
+        self.heuristic_max_freq_factor = heuristic_max_freq_factor
+        self.heuristic_time_quot = heuristic_time_quot
+        self.heuristic_time_offset = heuristic_time_offset
+        self.heuristic_min_effort = heuristic_min_effort
+        self.max_cut_rounds = max_cut_rounds
+        self.max_cuts_per_round = max_cuts_per_round
+        self.cut_max_age = cut_max_age
+        self.cut_stall_rounds = cut_stall_rounds
+        self.node_cut_freq = node_cut_freq
+
+    def gap_closed(self, incumbent: float, best_bound: float) -> bool:
+        """Whether the incumbent is proven optimal within the absolute or relative gap."""
+        gap = incumbent - best_bound
+        return gap <= self.abs_gap or (incumbent != 0 and gap / abs(incumbent) < self.rel_gap)
+
+    def __repr__(self):
+        return "SolverParams(" + ", ".join(f"{key}={value}" for key, value in vars(self).items()) + ")"
@@ -1,5 +1,7 @@
+import os
 import time
 import random
+from collections import deque
 import numpy as np
 
 from bnb.active_path import ActivePathManager
@@ -7,22 +9,43 @@ from bnb.node import Node
 from bnb.branching import Branching
 # from bnb.shared_state import SharedState
 from bnb.tree import BranchAndBoundTree
+from bnb.parallel_search import ParallelTreeSearch
+from bnb.checkpoint import save_checkpoint, load_checkpoint
+from bnb.params import SolverParams
+from bnb.diving import DivingHeuristics
+from bnb.lns import LargeNeighborhoodSearch
+from bnb.heuristic_scheduler import HeuristicScheduler
 
 from cutgen.Cliques import *
 from cutgen.graph_builder import *
+from cutgen.cut_pool import CutPool
 
 import gurobipy as gp
 from gurobipy import GRB
 
 class BranchAndBoundSolver:
-    def __init__(self, mip_instance,enable_plunging=False,k_plunging=10,clique_cuts=False,strong_depth=10,strong_k=1500):
+    def __init__(self, mip_instance,enable_plunging=False,k_plunging=10,clique_cuts=False,strong_depth=10,strong_k=1500,strong_workers=1,reliability=None,branching_history=None,tree_workers=1,incumbent_channel=None,
+                 checkpoint=None,checkpoint_interval=60,resume=False,params=None):
 
         self.instance = mip_instance
+        self.params = params if params is not None else SolverParams() #Limits and heuristic settings
 
         ### Branching ###
         self.strong_depth = strong_depth
         self.strong_k = strong_k
-        self.brancher = Branching(self.instance,strong_depth=self.strong_depth, k=self.strong_k)
+        self.strong_workers = strong_workers
+        self.brancher = Branching(self.instance,strong_depth=self.strong_depth, k=self.strong_k, workers=self.strong_workers,
+                                  reliability=reliability)
+        self.tree_workers = tree_workers #Worker processes of the parallel tree search, 1 = serial
+        self.incumbent_channel = incumbent_channel #Incumbent shared with concurrent runs, see portfolio.py
+        self.checkpoint = checkpoint #.npz file the search state is periodically written to
+        self.checkpoint_interval = checkpoint_interval #Seconds between checkpoints
+        self.resume = resume #Continue from the checkpoint file if it exists
+        self.status = None #optimal, infeasible, cutoff, timeout, node_limit, interrupted or error once solve() returns
+        self.branching_history = branching_history #.npz file the branching history is loaded from and saved to
+        if self.branching_history and os.path.exists(self.branching_history):
+            matched=self.brancher.load_history(self.branching_history)
+            print(f"Loaded branching history for {matched} variables from {self.branching_history}")
 
         ### Clique cuts ###
         self.enable_clique_cuts = clique_cuts
@@ -32,22 +55,16 @@ class BranchAndBoundSolver:
         self.k_plunging = k_plunging
 
         ### Primal Heuristics ###
-        self.enable_pump=True
-        self.n_pump_incumbent=20
-        self.n_pump = 2
-        self.fp_max_it=10000
         self.pump_model = None
         self.pump_x_vars = None
         self.pump_d_vars = None
         self.pump_dist_constrs_le = None
         self.pump_dist_constrs_ge = None
-
-        self.enable_diving=True
-        self.n_diving=15
+        self.pump_rhs = None
+        self.pump_lp_iterations = 0 #Simplex iterations of all pump projections so far
 
         ### Compute locks
         self._compute_locks()
-        self.gap_treshold = 1e-3 #%
 
         ## Initializations
         self.best_obj = float("inf")
@@ -59,6 +76,21 @@ class BranchAndBoundSolver:
         self.I = [i for i, t in enumerate(self.instance.var_types) if t in ['B', 'I']]
         self.B = [i for i, t in enumerate(self.instance.var_types) if t in ['B']]
 
+        ## Diving
+        self.diver = DivingHeuristics(self.instance, self.brancher, self.down_locks, self.up_locks,
+                                      rules=self.params.diving_rules, lp_quot=self.params.diving_lp_quot,
+                                      lp_offset=self.params.diving_lp_offset)
+        self.tree_lp_iterations = 0 #Simplex iterations of the node LPs, the reference of the diving budget
+        self.lns = LargeNeighborhoodSearch(self)
+        self.scheduler = HeuristicScheduler({'pump': self.params.pump_freq, 'pump_incumbent': self.params.pump_freq_incumbent,
+                                             'diving': self.params.diving_freq, 'lns': self.params.lns_freq},
+                                            adaptive=self.params.adaptive_heuristics,
+                                            freq_growth=self.params.heuristic_freq_growth,
+                                            max_freq_factor=self.params.heuristic_max_freq_factor,
+                                            time_quot=self.params.heuristic_time_quot,
+                                            time_offset=self.params.heuristic_time_offset,
+                                            min_effort=self.params.heuristic_min_effort)
+
 
     def solve(self):
         ### Initialization of variables
@@ -66,7 +98,7 @@ class BranchAndBoundSolver:
         times=[]
         primal_bounds=[]
         dual_bounds=[]
-        TIMEOUT_SECONDS = 600
+        TIMEOUT_SECONDS = self.params.time_limit
 
         ### Initializing cliques
 
@@ -82,15 +114,21 @@ class BranchAndBoundSolver:
             conflict_graph = graph_builder(seed_cliques)
             print(
                 f"    Built conflict graph with {conflict_graph.number_of_nodes()} nodes and {conflict_graph.number_of_edges()} edges.")
-            self.strengthened_cliques = clique_extension(conflict_graph, seed_cliques)
+            self.conflict_adjacency = conflict_adjacency(conflict_graph, self.instance.num_vars)
+            self.strengthened_cliques = clique_extension(self.conflict_adjacency, seed_cliques)
             elapsed_cliques_time=time.time()-start_cliques_time
             print(f"    Extended to {len(self.strengthened_cliques)} maximal cliques in {elapsed_cliques_time}.")
+            self.cut_pool = CutPool(self.strengthened_cliques, self.instance.num_vars,
+                                    max_cuts_per_round=self.params.max_cuts_per_round,
+                                    max_age=self.params.cut_max_age)
 
         ### Assembling a model for the root
 
         self.instance.build_root_model()
         working_model = self.instance.root_lp_model.copy()
         working_model.setParam("OutputFlag", 0)
+        num_base_rows = working_model.NumConstrs #Rows past this one are cuts
+        resuming = self.resume and self.checkpoint is not None and os.path.exists(self.checkpoint)
 
         ### Creating the root as a node
 
@@ -101,15 +139,27 @@ class BranchAndBoundSolver:
         root.node_type = 'root'
         if root.is_infeasible:
             print("\n The problem is infeasible")
+            self.status = 'infeasible'
             return None,None
         print("\nRoot relaxation: objective %.8f, time %.2f seconds\n" % (root.bound, elapsed_time))
-        if self.enable_clique_cuts:
-            for i in range(20):
+        if self.enable_clique_cuts and not resuming:
+            round_bounds = [root.bound]
+            stall = self.params.cut_stall_rounds
+            for i in range(self.params.max_cut_rounds):
                 num_new_cuts=self._separate_clique_cuts(root,working_model)
-                if num_new_cuts>0:
-                    root.evaluate_lp(working_model, self.instance)
-                else:
+                if num_new_cuts==0:
+                    break
+                root.evaluate_lp(working_model, self.instance)
+                if root.is_infeasible:
                     break
+                num_aged = self.cut_pool.age_cuts(working_model)
+                round_bounds.append(root.bound)
+                print(f"    Cut round {i + 1}: {num_new_cuts} added, {num_aged} aged out, {len(self.cut_pool.constrs)} in LP, bound {root.bound:.6f}")
+                if len(round_bounds) > stall and round_bounds[-1] - round_bounds[-1 - stall] < 1e-4 * max(1.0, abs(round_bounds[-1])):
+                    break
+            # Cuts slack at the final root LP would only slow down the node LPs
+            if not root.is_infeasible and self.cut_pool.drop_slack(working_model) > 0:
+                root.evaluate_lp(working_model, self.instance)
         print("Root relaxation: objective %.8f, time %.2f seconds\n" % (root.bound, elapsed_time))
 
         ### Creating tree and activity manager
@@ -117,41 +167,102 @@ class BranchAndBoundSolver:
         tree = BranchAndBoundTree()
         active_mgr = ActivePathManager(root,self.instance)
 
-        branch_var, left_node, right_node = self.brancher.select_branching_variable(root, root.solution, working_model,active_mgr,clique_cuts=self.enable_clique_cuts)
-
-        if branch_var is None:
-            print("✅ Root node is optimal or infeasible after cuts.")
-            return root.solution, root.bound, None, None, None, None, None
-
-        tree.push_children(left_node, right_node)
-
         node_counter = 0
+        previous_elapsed = 0
         incumbent = None
         print_stats=False
 
+        if resuming:
+            # The saved cuts replace root separation and the saved open nodes the root branching
+            nodes, node_counter, previous_elapsed, times, primal_bounds, dual_bounds = load_checkpoint(self.checkpoint, self, root, working_model)
+            root.evaluate_lp(working_model, self.instance)
+            root.attach_children(nodes)
+            for node in nodes:
+                tree.push(node)
+            if self.best_sol is not None:
+                incumbent = self.best_obj
+            print(f"Resumed from {self.checkpoint}: {len(nodes)} open nodes, {node_counter} explored, incumbent {self.best_obj}")
+        else:
+            branch_var, left_node, right_node = self.brancher.select_branching_variable(root, root.solution, working_model,active_mgr,clique_cuts=self.enable_clique_cuts)
+
+            if branch_var is None:
+                print("✅ Root node is optimal or infeasible after cuts.")
+                self.status = 'optimal'
+                if root.bound < self.best_obj:
+                    self.best_obj, self.best_sol = root.bound, root.solution
+                    self.share_incumbent()
+                return root.solution, root.bound, None, None, None, None, None
+
+            lns_obj = None
+            if self.params.enable_lns:
+                # Before the root releases its LP solution
+                lns_obj, lns_sol = self.lns.rens(root.solution, TIMEOUT_SECONDS - (time.time() - start_total_solver_time))
+
+            root.attach_children([left_node, right_node])
+            tree.push_children(left_node, right_node)
+
+            if lns_obj is not None and lns_obj < self.best_obj:
+                self.best_obj, self.best_sol = lns_obj, lns_sol
+                self.prune_dominated(tree)
+                incumbent = self.best_obj
+                print(f"RENS FOUND NEW INCUMBENT: {self.best_obj:.5f}")
+
         mode = "best-first"
         self.max_processed_depth=0
         self.plunge_steps_done=0
 
 
-        incumbent_str="     -     "
+        incumbent_str="     -     " if incumbent is None else f"{incumbent:10.5f}"
         gap_str = "  -  "
+        in_process = None #Last popped node, still owed to the tree unless pruned or branched
+        last_checkpoint = time.time()
         print("    Nodes     |          Current Node         |        Objective Bounds        |  Time   |")
         print(" Expl  Unexpl |  Obj         Depth     IntInf | Incumbent    BestBd      Gap   |   (s)   |")
         print("--------------+-------------------------------+--------------------------------+----------+")
         try:
-            start_tree_time=time.time()
+            start_tree_time=time.time()-previous_elapsed
+            if self.tree_workers > 1:
+                # Hands the open nodes to the parallel search, which drains the tree and puts back
+                # what it did not finish; the serial loop below takes over those nodes unless a limit hit
+                search = ParallelTreeSearch(self, working_model, self.tree_workers)
+                checkpoint = None
+                if self.checkpoint:
+                    checkpoint = lambda nodes, count: save_checkpoint(self.checkpoint, self, nodes, working_model, num_base_rows, count,
+                                                                      time.time() - start_tree_time, times, primal_bounds, dual_bounds)
+                node_counter = search.run(tree, root, times, primal_bounds, dual_bounds, start_total_solver_time, TIMEOUT_SECONDS,
+                                          node_counter=node_counter, checkpoint=checkpoint)
             while not tree.empty():
 
                 ########## CHECK IF WE HAVE TIME #########
 
                 if time.time() - start_total_solver_time > TIMEOUT_SECONDS:
                     print("\n⏰ Timeout limit reached. Terminating search.")
+                    self.status = 'timeout'
                     break  # Exit the loop gracefully
 
+                if self.params.node_limit is not None and node_counter >= self.params.node_limit:
+                    print("\n Node limit reached. Terminating search.")
+                    self.status = 'node_limit'
+                    break
+
+                if self.checkpoint and time.time() - last_checkpoint > self.checkpoint_interval:
+                    save_checkpoint(self.checkpoint, self, tree.open_nodes(), working_model, num_base_rows, node_counter,
+                                    time.time() - start_tree_time, times, primal_bounds, dual_bounds)
+                    last_checkpoint = time.time()
+
+                ########## INCUMBENT OF CONCURRENT RUNS #########
+
+                if self.incumbent_channel is not None and self.incumbent_channel.value < self.best_obj:
+                    # Only a cutoff: the solution stays with the run that found it, ours is dominated
+                    self.best_obj = self.incumbent_channel.value
+                    self.best_sol = None
+                    self.prune_dominated(tree)
+
                 ########## NODE SELECTION #########
 
                 current_tree_best_bound = tree.get_best_bound()
+                if self.params.open_node_limit is not None and len(tree) > self.params.open_node_limit:
+                    mode = "dfs" # Over the memory budget: close subtrees before opening new ones
                 if mode == "dfs":
                     node=tree.pop_dfs()
                     if node is None:
@@ -161,16 +272,25 @@ class BranchAndBoundSolver:
                     node=tree.pop_best_bound()
                     if node is None:
                         break
+                in_process = node
 
                 ########## NODE SOLVE #########
 
+                # Children keep the LP bound they got when created, so dominated ones need no re-solve
+                if node.bound is not None and node.bound > self.best_obj:
+                    self.prune_if_leaf(node)
+                    continue
+
                 node_counter += 1
                 active_mgr.switch_focus(node, working_model)
                 node.evaluate_lp(working_model,self.instance)
-                # if self.enable_clique_cuts and node.depth % 50 ==0:
-                #     num_new_cuts = self._separate_clique_cuts(node, working_model)
-                #     if num_new_cuts > 0:
-                #         node.evaluate_lp(working_model, self.instance)
+                self.tree_lp_iterations += working_model.IterCount
+                # Clique cuts are globally valid; rows are only appended here so stored bases stay aligned
+                cut_freq = self.params.node_cut_freq
+                if self.enable_clique_cuts and cut_freq and node_counter % cut_freq == 0 and not node.is_infeasible and not node.is_integer:
+                    num_new_cuts = self._separate_clique_cuts(node, working_model)
+                    if num_new_cuts > 0:
+                        node.evaluate_lp(working_model, self.instance)
                 elapsed_time = time.time() - start_tree_time
 
                 ########## NODE PRUNNING #########
@@ -182,30 +302,29 @@ class BranchAndBoundSolver:
 
                 ########## STATS AND INFO #########
 
-                int_infeas = sum(
-                    1 for i, v in enumerate(node.solution or [])
-                    if self.instance.var_types[i] in ['B', 'I'] and abs(v - round(v)) > 1e-6
-                )
-                if self.instance.is_integral(node.solution):
+                int_infeas = len(node.fractional) if node.fractional is not None else 0
+                if node.is_integer:
                     if node.bound < self.best_obj:
                         self.best_obj=node.bound
                         self.best_sol=node.solution
+                        self.prune_dominated(tree)
                         incumbent=self.best_obj
                         incumbent_str = f"{incumbent:10.5f}"
-                        gap_number=(incumbent - current_tree_best_bound) / abs(incumbent)
+                        gap_number=(incumbent - current_tree_best_bound) / max(1e-10, abs(incumbent))
                         gap_str = f"{gap_number*100:4.1f}%"
                         print(f"P{node_counter:5d} {unexplored:5d}  |{node.bound:8.5f}  {node.depth:5d}      {int_infeas:6d}  |{incumbent_str}  {current_tree_best_bound:8.5f}  {gap_str}  |  {elapsed_time:4.2f}s")
                         times.append(elapsed_time)
                         primal_bounds.append(incumbent)
                         dual_bounds.append(current_tree_best_bound)
 
-                        if incumbent and gap_number and gap_number<self.gap_treshold:
+                        if self.params.gap_closed(incumbent, current_tree_best_bound):
+                            self.prune_if_leaf(node) #Or the final checkpoint would save it as open
                             break
                     self.prune_if_leaf(node)
                     continue
-                if incumbent:
+                if incumbent is not None:
                     primal_bounds.append(incumbent)
-                    gap_number = (incumbent - current_tree_best_bound) / abs(incumbent)
+                    gap_number = (incumbent - current_tree_best_bound) / max(1e-10, abs(incumbent))
                     gap_str = f"{gap_number * 100:4.1f}%"
                 else:
                     primal_bounds.append(None)
@@ -215,35 +334,50 @@ class BranchAndBoundSolver:
 
                 ########## PRIMAL HEURISTICS ZONE #########
 
-                if not incumbent and self.enable_pump and (node_counter%self.n_pump==0):
-                    if node.solution is not None:
-                        fp_obj,fp_sol=self.feasibility_pump(node.solution, working_model)
-                        if fp_obj is not None:
-                            self.best_obj = fp_obj
-                            self.best_sol = fp_sol
-                            incumbent = self.best_obj
-                            incumbent_str = f"{incumbent:10.5f}"
-                            print(f"FP FOUND NEW INCUMBENT: {self.best_obj:.5f}")
-
-                if incumbent and self.enable_pump and (node_counter%self.n_pump_incumbent==0):
-                    if node.solution is not None:
-                        fp_obj, fp_sol = self.feasibility_pump(node.solution, working_model)
-                        if fp_obj is not None and fp_obj<self.best_obj:
-                            self.best_obj = fp_obj
-                            self.best_sol = fp_sol
-                            incumbent = self.best_obj
-                            incumbent_str = f"{incumbent:10.5f}"
-                            print(f"FP FOUND NEW INCUMBENT: {self.best_obj:.5f}")
-
-                if self.enable_diving and (node_counter%self.n_diving==0):
-                    if node.solution is not None:
-                        dv_obj,dv_sol=self._diving_heuristic(node, working_model,active_mgr)
-                        if dv_obj is not None and dv_obj<self.best_obj:
-                            self.best_obj = dv_obj
-                            self.best_sol = dv_sol
-                            incumbent = self.best_obj
-                            incumbent_str = f"{incumbent:10.5f}"
-                            print(f"DV FOUND NEW INCUMBENT: {self.best_obj:.5f}")
+                elapsed_total = time.time() - start_total_solver_time
+                pump = 'pump_incumbent' if self.best_obj < float('inf') else 'pump'
+                if self.params.enable_pump and node.solution is not None and self.scheduler.due(pump, node_counter, elapsed_total):
+                    start_heur, iterations = time.time(), self.pump_lp_iterations
+                    fp_obj, fp_sol = self.feasibility_pump(node.solution, working_model, self.scheduler.effort(pump))
+                    found = fp_obj is not None and fp_obj < self.best_obj
+                    self.scheduler.record(pump, node_counter, time.time() - start_heur, self.pump_lp_iterations - iterations, found)
+                    if found:
+                        self.best_obj = fp_obj
+                        self.best_sol = fp_sol
+                        self.prune_dominated(tree)
+                        incumbent = self.best_obj
+                        incumbent_str = f"{incumbent:10.5f}"
+                        print(f"FP FOUND NEW INCUMBENT: {self.best_obj:.5f}")
+
+                if self.params.enable_diving and node.solution is not None and self.scheduler.due('diving', node_counter, elapsed_total):
+                    start_heur, iterations = time.time(), self.diver.lp_iterations
+                    rule = self.scheduler.select('diving', self.diver.available_rules(self.best_sol is not None))
+                    dv_obj, dv_sol = self.diver.dive(node, working_model, rule, self.best_sol, self.best_obj, self.tree_lp_iterations)
+                    found = dv_obj is not None and dv_obj < self.best_obj
+                    self.scheduler.record('diving', node_counter, time.time() - start_heur, self.diver.lp_iterations - iterations,
+                                          found, arm=rule)
+                    if found:
+                        self.best_obj = dv_obj
+                        self.best_sol = dv_sol
+                        self.prune_dominated(tree)
+                        incumbent = self.best_obj
+                        incumbent_str = f"{incumbent:10.5f}"
+                        print(f"DV FOUND NEW INCUMBENT: {self.best_obj:.5f}")
+
+                if self.params.enable_lns and self.best_sol is not None and node.solution is not None and self.scheduler.due('lns', node_counter, elapsed_total):
+                    start_heur, iterations = time.time(), self.lns.lp_iterations
+                    method = self.scheduler.select('lns', ['rins', 'local_branching'])
+                    lns_obj, lns_sol = self.lns.run(method, node.solution, TIMEOUT_SECONDS - elapsed_total, self.scheduler.effort('lns'))
+                    found = lns_obj is not None and lns_obj < self.best_obj
+                    self.scheduler.record('lns', node_counter, time.time() - start_heur, self.lns.lp_iterations - iterations,
+                                          found, arm=method)
+                    if found:
+                        self.best_obj = lns_obj
+                        self.best_sol = lns_sol
+                        self.prune_dominated(tree)
+                        incumbent = self.best_obj
+                        incumbent_str = f"{incumbent:10.5f}"
+                        print(f"LNS FOUND NEW INCUMBENT: {self.best_obj:.5f}")
 
                 ########## BRANCHING ZONE #########
 
@@ -251,9 +385,11 @@ class BranchAndBoundSolver:
                 if branch_var is None:
                     self.prune_if_leaf(node)
                     continue
-                node.children.extend([left_node, right_node])
                 node.node_type = 'fork' if node.lp_basis else 'junction'
+                node.attach_children([left_node, right_node])
                 tree.push_children(left_node,right_node)
+                if not node.open_children:
+                    self.prune_if_leaf(node)
 
                 ########## NODE SELECTION ZONE #########
 
@@ -285,18 +421,38 @@ class BranchAndBoundSolver:
         except Exception as e:
             import traceback
             traceback.print_exc()
+            self.status = 'error'
         except KeyboardInterrupt:
+            self.status = 'interrupted'
             print("\n\n🛑 User interrupt detected! Stopping search.")
             print("Returning best solution found so far.")
 
         ########## END ZONE #########
 
         finally:
+            if self.status is None:
+                if self.best_sol is not None:
+                    self.status = 'optimal'
+                elif self.best_obj < float('inf'):
+                    self.status = 'cutoff' #Nothing beats the incumbent of the concurrent runs
+                else:
+                    self.status = 'infeasible'
+            self.brancher.close()
+            if self.checkpoint:
+                open_nodes = tree.open_nodes()
+                if in_process is not None and in_process.active and in_process.node_type not in ('fork', 'junction'):
+                    open_nodes.append(in_process)
+                save_checkpoint(self.checkpoint, self, open_nodes, working_model, num_base_rows, node_counter,
+                                time.time() - start_tree_time, times, primal_bounds, dual_bounds)
+                print(f"Search state with {len(open_nodes)} open nodes saved to {self.checkpoint}")
+            if self.branching_history:
+                self.brancher.save_history(self.branching_history)
             end_total_solver_time = time.time()
             elapsed_total_solver_time = end_total_solver_time - start_total_solver_time
             print(f"Best solution:{self.best_obj:.5f}")
             print("Total solver time: {:.4f} seconds".format(elapsed_total_solver_time))
             print(f"Total number of nodes explored:{node_counter}")
+            self.scheduler.summary()
 
             return self.best_sol, self.best_obj, times, primal_bounds, dual_bounds, elapsed_total_solver_time,node_counter
 
@@ -309,7 +465,8 @@ class BranchAndBoundSolver:
         self.pump_x_vars = self.pump_model.addVars(N, lb=self.instance.lb, ub=self.instance.ub, name="x")
         self.pump_d_vars = self.pump_model.addVars(self.I, lb=0.0, name="d")
         for i in range(self.instance.num_constraints):
-            expr = gp.quicksum(self.instance.A[i, j] * self.pump_x_vars[j] for j in N if self.instance.A[i, j] != 0)
+            cols, vals = self.instance.row_entries(i)
+            expr = gp.quicksum(a_ij * self.pump_x_vars[j] for j, a_ij in zip(cols, vals))
             sense = self.instance.sense[i]
             rhs = self.instance.b[i]
             if sense == 'L':
@@ -319,45 +476,84 @@ class BranchAndBoundSolver:
         self.pump_dist_constrs_le = {j: self.pump_model.addConstr(self.pump_x_vars[j] - self.pump_d_vars[j] <= 0) for j in self.I}
         self.pump_dist_constrs_ge = {j: self.pump_model.addConstr(self.pump_x_vars[j] + self.pump_d_vars[j] >= 0) for j in self.I}
         self.pump_model.setObjective(gp.quicksum(self.pump_d_vars[j] for j in self.I), GRB.MINIMIZE)
+        self.pump_model.update()
+        self.pump_rhs = np.zeros(self.instance.num_vars) #Rounded values the distance rows currently hold
 
 
 
-    def feasibility_pump(self, start_x, working_model):
+    def feasibility_pump(self, start_x, working_model, effort=1.0):
+        """
+        Objective feasibility pump: alternates rounding with projecting the rounding onto the
+        LP, minimizing (1 - alpha) * distance + alpha * sqrt(|I|) / ||c|| * c'x with alpha
+        decaying by params.pump_alpha_decay per iteration. A rounding already projected in
+        the last iterations at nearly the same alpha is a cycle and is broken by flips.
+        `effort` scales the number of iterations without a closer projection the pump
+        tolerates before it gives up.
+        """
         if self.pump_model is None:
             self._build_pump_model()
         x_bar = np.array(start_x)
-        previous_distance = float('inf')
+        I = np.array(self.I, dtype=int)
+        pump_x_list = [self.pump_x_vars[j] for j in range(self.instance.num_vars)]
+        pump_d_list = [self.pump_d_vars[j] for j in self.I]
+        c = np.asarray(self.instance.obj, dtype=float)
+        c_norm = np.linalg.norm(c)
+        obj_scale = np.sqrt(len(I)) / c_norm if c_norm > 0 else 0.0
+        alpha = self.params.pump_alpha
+        written_alpha = None
+        recent = deque(maxlen=100) #(hash of the rounding, alpha) of the last projections
+        best_distance = float('inf')
+        B = np.array(self.B, dtype=int)
         stall_counter = 0
-        for iteration in range(self.fp_max_it):
+        for iteration in range(self.params.pump_max_iter):
             try:
                 x_round = np.round(x_bar) # Simplified rounding
                 if self._check_lp_feasibility(x_round):
-                    final_obj = np.dot(self.instance.obj, x_round)
+                    final_obj = np.dot(self.instance.obj, x_round) + self.instance.obj_const
                     return final_obj, x_round
-                if iteration > 0 and 'distance' in locals() and distance >= previous_distance:
-                    stall_counter += 1
-                    if stall_counter > 20:
-                        return None, None
-                    troubled_vars = [j for j in self.I if abs(x_bar[j] - x_round[j]) > 1e-6]
-                    if not troubled_vars: troubled_vars = self.I
-                    num_flips = min(len(troubled_vars), 10)
-                    vars_to_flip = random.sample(troubled_vars, num_flips)
-                    for j in vars_to_flip:
-                        if self.instance.var_types[j] == 'B': x_round[j] = 1 - x_round[j]
-                else:
-                    stall_counter = 0
-                for j in self.pump_dist_constrs_le:
-                    self.pump_dist_constrs_le[j].RHS = x_round[j]
-                    self.pump_dist_constrs_ge[j].RHS = x_round[j]
+                # A rounding projected before at nearly the same alpha would project the same way
+                key = hash(x_round[I].tobytes())
+                cycle = [a - alpha < 0.005 for k, a in recent if k == key]
+                if cycle and np.array_equal(x_round[I], self.pump_rhs[I]) and cycle[-1]:
+                    # Same rounding as the last projection: flip the binaries farthest from it
+                    gap = np.abs(x_bar[B] - x_round[B])
+                    order = np.argsort(-gap, kind='stable')[:random.randint(5, 15)]
+                    flip = B[order[gap[order] > 1e-6]]
+                    x_round[flip] = 1 - x_round[flip]
+                elif any(cycle):
+                    # Longer cycle: flip each binary off its rounded value with probability 1/2
+                    troubled = B[np.abs(x_bar[B] - x_round[B]) > 1e-6]
+                    flip = troubled[np.array([random.random() < 0.5 for _ in troubled], dtype=bool)]
+                    x_round[flip] = 1 - x_round[flip]
+                recent.append((hash(x_round[I].tobytes()), alpha))
+
+                # Only the distance rows whose rounded value changed are rewritten
+                changed = I[x_round[I] != self.pump_rhs[I]]
+                if len(changed):
+                    rows = [self.pump_dist_constrs_le[j] for j in changed] + [self.pump_dist_constrs_ge[j] for j in changed]
+                    self.pump_model.setAttr("RHS", rows, np.concatenate([x_round[changed], x_round[changed]]).tolist())
+                    self.pump_rhs[changed] = x_round[changed]
+                if alpha != written_alpha:
+                    self.pump_model.setAttr("Obj", pump_d_list, [1.0 - alpha] * len(pump_d_list))
+                    self.pump_model.setAttr("Obj", pump_x_list, (alpha * obj_scale * c).tolist())
+                    written_alpha = alpha
+
                 self.pump_model.optimize()
+                self.pump_lp_iterations += int(self.pump_model.IterCount)
                 if self.pump_model.Status != GRB.OPTIMAL: return None, None
-                distance = self.pump_model.ObjVal
-                previous_distance = distance
-                x_bar = np.array(list(self.pump_model.getAttr("X", self.pump_x_vars).values()))
-                if distance < 1e-6:
-                    if self._count_integer_infeasibilities(x_bar) == 0:
-                        final_obj = np.dot(self.instance.obj, x_bar) #+self.instance.obj_const
-                        return final_obj, x_bar
+                x_bar = np.array(self.pump_model.getAttr("X", pump_x_list))
+                distance = np.abs(x_bar[I] - x_round[I]).sum()
+                if distance < best_distance - 1e-6:
+                    best_distance, stall_counter = distance, 0
+                else:
+                    stall_counter += 1
+                # With the objective blended in, an integral projection can still be away from the rounding
+                if self._count_integer_infeasibilities(x_bar) == 0:
+                    final_obj = np.dot(self.instance.obj, x_bar) + self.instance.obj_const
+                    return final_obj, x_bar
+                if stall_counter >= max(1, int(effort * self.params.pump_stall_iter)):
+                    return None, None
+                alpha = alpha * self.params.pump_alpha_decay if alpha > 1e-4 else 0.0
             except Exception as e:
                 import traceback
                 traceback.print_exc()
@@ -366,118 +562,49 @@ class BranchAndBoundSolver:
 
 
     def _separate_clique_cuts(self,node,working_model):
-        if not self.strengthened_cliques or node.solution is None:
+        if node.solution is None:
             return 0
-        cuts_added = 0
-        lp_solution = node.solution
-        for clique in self.strengthened_cliques:
-            if sum(lp_solution[j] for j in clique) > 1.0 + 1e-6:
-                vars_in_cut=[working_model.getVarByName(self.instance.var_names[j]) for j in clique]
-                working_model.addConstr(gp.quicksum(vars_in_cut) <= 1)
-                cuts_added += 1
-        if cuts_added >0:
-            working_model.update()  # Apply changes to the model
-        return cuts_added
+        lp_solution = np.asarray(node.solution, dtype=float)
+        self.cut_pool.add_cliques(separate_violated_cliques(self.conflict_adjacency, lp_solution))
+        return self.cut_pool.separate(working_model, lp_solution)
 
 
 
     def _compute_locks(self):
         num_vars = self.instance.num_vars
-        self.down_locks = np.zeros(num_vars)
-        self.up_locks = np.zeros(num_vars)
-        for i in range(self.instance.num_constraints):
-            sense = self.instance.sense[i]
-            row = self.instance.A[i, :]
-            for j in np.nonzero(row)[0]:
-                coeff = row[j]
-                if sense == 'L':
-                    if coeff > 0:
-                        self.down_locks[j] += 1
-                    else:
-                        self.up_locks[j] += 1
-                elif sense == 'E':
-                    self.down_locks[j] += 1
-                    self.up_locks[j] += 1
-
-
-
-    def _simple_rounding_heuristic(self, lp_solution,fractional_vars):
-        rounded_solution = lp_solution.copy()
-        for var_idx,_ in fractional_vars:
-            if self.down_locks[var_idx] == 0:
-                rounded_solution[var_idx] = np.floor(lp_solution[var_idx])
-            elif self.up_locks[var_idx] == 0:
-                rounded_solution[var_idx] = np.ceil(lp_solution[var_idx])
-        return rounded_solution
-
-
-
-    def _diving_heuristic(self, node, working_model, active_path, max_dive_depth=2000):
-        original_focus = active_path.focus
-        current_solution = node.solution
-        current_node = node
-        for dive_step in range(max_dive_depth):
-            fractional_vars = [(j, current_solution[j]) for j in self.I if abs(current_solution[j] - round(current_solution[j])) > 1e-6]
-            if not fractional_vars:
-                dive_obj = np.dot(self.instance.obj, current_solution) #+ self.instance.obj_const
-                return dive_obj,current_solution
-            sr_sol = self._simple_rounding_heuristic(current_solution,fractional_vars)
-            fractional_vars = [(j, sr_sol[j]) for j in self.I if abs(sr_sol[j] - round(sr_sol[j])) > 1e-6]
-            if not fractional_vars:
-                dive_obj = np.dot(self.instance.obj, sr_sol)# + self.instance.obj_const
-                return dive_obj, sr_sol
-            binary_fractional_vars_after_round = [(j, sr_sol[j]) for j in self.B if abs(sr_sol[j] - round(sr_sol[j])) > 1e-6]
-            if not binary_fractional_vars_after_round:
-                fractional_vars_after_round = fractional_vars
-            else:
-                fractional_vars_after_round = binary_fractional_vars_after_round
-            best_dive_var = -1
-            min_lock_score = float('inf')
-            min_dist_to_int = float('inf')  # Tie-breaker: distance to nearest integer
-            for var_idx, frac_value in fractional_vars_after_round:
-                down_lock=self.down_locks[var_idx]
-                up_lock=self.up_locks[var_idx]
-                current_score = min(down_lock, up_lock)
-                if current_score < min_lock_score:
-                    min_lock_score = current_score
-                    best_dive_var = var_idx
-                    min_dist_to_int = min(frac_value - np.floor(frac_value), np.ceil(frac_value) - frac_value)
-                elif current_score==min_lock_score:
-                    current_dist_to_int = min(frac_value - np.floor(frac_value), np.ceil(frac_value) - frac_value)
-                    if current_dist_to_int < min_dist_to_int:
-                        best_dive_var = var_idx
-                        min_dist_to_int = current_dist_to_int
-            if best_dive_var == -1:
-                best_dive_var = max(fractional_vars_after_round, key=lambda item: 0.5 - abs(item[1] - 0.5))[0]
-            dive_down = self.down_locks[best_dive_var] <= self.up_locks[best_dive_var]
-            val = current_solution[best_dive_var]
-            bound_change = {}
-            if dive_down:
-                bound_change = {best_dive_var: (self.instance.lb[best_dive_var], np.floor(val))}
-            else:
-                bound_change = {best_dive_var: (np.ceil(val), self.instance.ub[best_dive_var])}
-            dive_node = Node(parent=current_node, bound_changes=bound_change, depth=current_node.depth + 1)
-            active_path.switch_focus(dive_node, working_model)
-            dive_node.evaluate_lp(working_model, self.instance)
-            if dive_node.is_infeasible:
-                break
-            current_solution = dive_node.solution
-            current_node = dive_node
-        active_path.switch_focus(original_focus, working_model)
-        return None, None
+        A = self.instance.A.tocoo()
+        sense = np.asarray(self.instance.sense)[A.row]
+        is_le = sense == 'L'
+        is_eq = sense == 'E'
+        down = (is_le & (A.data > 0)) | is_eq
+        up = (is_le & (A.data <= 0)) | is_eq
+        self.down_locks = np.bincount(A.col[down], minlength=num_vars).astype(float)
+        self.up_locks = np.bincount(A.col[up], minlength=num_vars).astype(float)
+
 
 
+    def prune_dominated(self, tree):
+        """Prunes every open node whose bound is worse than the incumbent right away."""
+        self.share_incumbent()
+        for node in tree.prune(self.best_obj):
+            self.prune_if_leaf(node)
+
+    def share_incumbent(self):
+        """Offers the incumbent to concurrent runs, which only take it if it beats theirs."""
+        if self.incumbent_channel is not None and self.best_sol is not None:
+            self.incumbent_channel.publish(self.best_sol)
 
     def prune_if_leaf(self, node):
         node.active=False
+        node.release_lp_data()
         parent=node.parent
         while parent:
-            parent.children=[c for c in parent.children if c.active]
-            if not parent.children:
-                parent.active=False
-                parent=parent.parent
-            else:
+            parent.open_children-=1
+            if parent.open_children>0:
                 break
+            parent.active=False
+            parent.release_lp_data()
+            parent=parent.parent
 
 
 
@@ -485,20 +612,12 @@ class BranchAndBoundSolver:
         """Checks if a solution vector satisfies all LP constraints."""
         if sol is None:
             return False
-        for i in range(self.instance.num_constraints):
-            lhs = np.dot(self.instance.A[i, :], sol)
-            rhs = self.instance.b[i]
-            sense = self.instance.sense[i]
-            if sense == 'L' and lhs > rhs + tol:
-                return False  # Violation
-            elif sense == 'E' and abs(lhs - rhs) > tol:
-                return False  # Violation
-        return True
+        max_violation, _, _ = self.instance.row_violations(sol, tol)
+        return max_violation <= tol
 
 
 
     def _count_integer_infeasibilities(self, sol, tol=1e-6):
         if sol is None:
             return float('inf')
-        return sum(1 for i, vtype in enumerate(self.instance.var_types)
-                   if vtype in ['B', 'I'] and abs(sol[i] - round(sol[i])) > tol)
+        return len(self.instance.integer_infeasibilities(sol, tol))
@@ -2,67 +2,111 @@ import heapq
 import itertools
 
 class BranchAndBoundTree:
+    """
+    Open nodes in a single indexed binary heap ordered by (bound, insertion count). The heap
+    position of every open node is indexed, so a node leaves the tree in O(log n) whichever
+    way it is selected and no stale entries are left behind. The index keeps insertion
+    order, so depth-first selection takes its last node.
+    """
     def __init__(self):
-        #Min-heap for best-bound search
-        self.best_bound_queue = []
-        self.dfs_stack=[]
+        self.heap = [] #(bound, count, node)
+        self.position = {} #node -> index in heap, in insertion order
         self.counter = itertools.count()  # Unique counter to break ties
 
     def __len__(self):
-        #The number of unique nodes still in the tre
-        return len(self.dfs_stack)
+        #The number of nodes still in the tree
+        return len(self.heap)
 
     def empty(self):
-        return not self.dfs_stack
+        return not self.heap
 
     def push(self, node):
-        """
-        Pushes a new node to BOTH data structures
-        """
-
-        if node.processed:
+        if node.processed or node in self.position:
             return
+        self.heap.append((node.bound, next(self.counter), node))
+        self.position[node] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+
+    def _swap(self, i, j):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.position[heap[i][2]] = i
+        self.position[heap[j][2]] = j
 
-        count = next(self.counter)
-        heapq.heappush(self.best_bound_queue, (node.bound,count, node))
-        self.dfs_stack.append(node)
+    def _sift_up(self, i):
+        heap = self.heap
+        while i > 0:
+            parent = (i - 1) // 2
+            if heap[i][:2] >= heap[parent][:2]:
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i):
+        heap = self.heap
+        n = len(heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and heap[child][:2] < heap[smallest][:2]:
+                    smallest = child
+            if smallest == i:
+                return
+            self._swap(i, smallest)
+            i = smallest
+
+    def _take(self, node):
+        """Removes an open node from the heap and the index."""
+        i = self.position[node]
+        last = len(self.heap) - 1
+        if i != last:
+            self._swap(i, last)
+        self.heap.pop()
+        del self.position[node]
+        if i < len(self.heap):
+            self._sift_down(i)
+            self._sift_up(i)
+        node.processed = True
+        return node
 
     def pop_best_bound(self):
-        """
-        Pops the node with the best (lowest) bound from the heap
-        Skips nodes that have already been processed via the DFS stack
-        """
-        while self.best_bound_queue:
-            _bound,_count,node=heapq.heappop(self.best_bound_queue)
-            if not node.processed:
-                node.processed = True
-                self.dfs_stack.remove(node)
-                return node
-        return None
+        """Pops the node with the best (lowest) bound."""
+        if not self.heap:
+            return None
+        return self._take(self.heap[0][2])
 
     def pop_dfs(self):
-        """
-        Pops the most recently added node (LIFO)
-        Skips nodes that have already been processed via the best-bound queue
-        """
-        while self.dfs_stack:
-            node = self.dfs_stack.pop()
-            if not node.processed:
-                node.processed = True
-                return node
-        return None
+        """Pops the most recently added node (LIFO)."""
+        if not self.heap:
+            return None
+        return self._take(next(reversed(self.position)))
 
-    def get_best_bound(self):
+    def prune(self, cutoff):
         """
-        Efficiently peeks at the best bound from the top of the heap.
+        Removes every open node whose bound exceeds cutoff (e.g. a new incumbent) and
+        returns them. The heap is rebuilt once in linear time rather than node by node.
         """
-        # Clean up the heap from any already-processed nodes at the top
-        while self.best_bound_queue and self.best_bound_queue[0][2].processed:
-            heapq.heappop(self.best_bound_queue)
+        pruned = [node for bound, _count, node in self.heap if bound > cutoff]
+        if not pruned:
+            return pruned
+        for node in pruned:
+            del self.position[node]
+            node.processed = True
+        self.heap = [entry for entry in self.heap if entry[0] <= cutoff]
+        heapq.heapify(self.heap)
+        for i, entry in enumerate(self.heap):
+            self.position[entry[2]] = i
+        return pruned
+
+    def open_nodes(self):
+        """The nodes still in the tree, oldest first."""
+        return list(self.position)
 
-        if not self.best_bound_queue:
+    def get_best_bound(self):
+        """The best bound of the open nodes, at the root of the heap."""
+        if not self.heap:
             return float('inf')
-        return self.best_bound_queue[0][0]  # The best bound is always at the root of the heap
+        return self.heap[0][0]
 
     def push_children(self,left_node,right_node):
         """
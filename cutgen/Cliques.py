@@ -1,5 +1,6 @@
 from cutgen.aux import extract_ordered_fractional_map
 import gurobipy as gp
+import numpy as np
 
 def clique_detection(A,b):
     """
@@ -40,48 +41,80 @@ def clique_detection(A,b):
                         S.append(clique_candidate)
     return S
 
-def clique_extension(G, S):
+def clique_extension(adj, S):
     """
-    Implements Algorithm 2: Clique Extension from the provided conflict graph G and clique C.
+    Implements Algorithm 2: Clique Extension from the provided conflict graph and cliques.
 
     Parameters:
-    - G: A NetworkX graph representing the conflict graph.
-    - C: A list of node identifiers representing the current clique.
+    - adj: CSR adjacency matrix of the conflict graph (see graph_builder.conflict_adjacency).
+    - S: A list of cliques, each a list of node identifiers.
 
     Returns:
-    - S_extended: The extended clique including additional nodes if possible.
+    - S_extended: The cliques extended with additional nodes where possible.
     """
+    degree = np.diff(adj.indptr)
     S_extended = []
     for clique in S:
         # 1. Let d be the vertex with the smallest degree
-        d = min(clique, key=lambda node: G.degree[node])
+        d = min(clique, key=lambda node: degree[node])
 
-        # 2. Candidate set L: neighbors of d not in C
-        #L = {k for k in G.neighbors(d) if k not in clique}
-        L = sorted(
-            [k for k in G.neighbors(d) if k not in clique],
-            key=lambda node: G.degree[node],
-            reverse=True
-        )
+        # 2. Candidate set L: neighbors of d not in C, adjacent to all of C
+        L = np.setdiff1d(_neighbors(adj, d), clique, assume_unique=True)
+        for k in clique:
+            L = np.intersect1d(L, _neighbors(adj, k), assume_unique=True)
 
         # 3. Initialize extended clique C'
         C_extended = list(clique)
 
-        # 4. While there are candidates to try
-        while L:
-            # 5. Pick l in L with the largest degree in G
-            l = max(L, key=lambda node: G.degree[node])
-            # 6. Remove l from L
-            L.remove(l)
-
-            # 7. Check if l is adjacent to all nodes in the current clique
-            if all(l in G.neighbors(k) for k in C_extended):
-                C_extended.append(l)
+        # 4. While there are candidates, add the one with the largest degree in G and
+        # keep only the candidates adjacent to it
+        while len(L):
+            l = L[np.argmax(degree[L])]
+            C_extended.append(int(l))
+            L = np.intersect1d(L, _neighbors(adj, l), assume_unique=True)
 
         S_extended.append(C_extended)
 
     return S_extended
 
+def separate_violated_cliques(adj, x, min_weight=1.0 + 1e-6, tol=1e-6):
+    """
+    Greedy weighted max-clique search on the conflict graph restricted to the support of
+    the LP solution x. From every fractional vertex a clique is grown by the neighbor of
+    largest x adjacent to all its members; cliques of weight sum(x) > min_weight are
+    lifted with zero-valued vertices into maximal cliques.
+
+    Returns the violated cliques found, as sorted tuples without duplicates.
+    """
+    num_nodes = adj.shape[0]
+    x = np.asarray(x, dtype=float)[:num_nodes]
+    degree = np.diff(adj.indptr)
+    in_support = x > tol
+    starts = np.flatnonzero(in_support & (x < 1 - tol) & (degree > 0))
+    starts = starts[np.argsort(-x[starts], kind='stable')]
+    found = {}
+    for v in starts:
+        clique = [int(v)]
+        L = _neighbors(adj, v)
+        candidates = L[in_support[L]]
+        while len(candidates):
+            l = candidates[np.argmax(x[candidates])]
+            clique.append(int(l))
+            L = np.intersect1d(L, _neighbors(adj, l), assume_unique=True)
+            candidates = np.intersect1d(candidates, L, assume_unique=True)
+        if x[clique].sum() <= min_weight:
+            continue
+        # Lifting: zero-valued vertices adjacent to the whole clique, by largest degree
+        while len(L):
+            l = L[np.argmax(degree[L])]
+            clique.append(int(l))
+            L = np.intersect1d(L, _neighbors(adj, l), assume_unique=True)
+        found.setdefault(tuple(sorted(clique)), None)
+    return list(found)
+
+def _neighbors(adj, v):
+    return adj.indices[adj.indptr[v]:adj.indptr[v + 1]]
+
 def clique_cut_separator(parsed_data,best_A,G,S_strenghtned,max_rounds=20,min_viol=1e-4,instance_name="instance_0004.txt"):
     """
     Cutting-plane loop that reuses precomputed full cliques and conflict graph
@@ -0,0 +1,106 @@
+import numpy as np
+import gurobipy as gp
+from gurobipy import GRB
+from scipy.sparse import csr_matrix, vstack
+
+from bnb.node import model_vars
+
+
+class CutPool:
+    """
+    Clique cuts sum(x_j for j in C) <= 1 stored outside the LP. A separation round adds only
+    the most efficacious violated cuts of the pool to the LP (efficacy = violation / ||a||,
+    the distance cut off from the LP solution); a cut of the LP that stays slack for more
+    than max_age rounds is removed from the LP again, but stays in the pool.
+    """
+    def __init__(self, cliques, num_vars, max_cuts_per_round=50, max_age=3, min_violation=1e-6):
+        self.num_vars = num_vars
+        self.max_cuts_per_round = max_cuts_per_round
+        self.max_age = max_age
+        self.min_violation = min_violation
+        self.rows = csr_matrix((0, num_vars))
+        self.norms = np.zeros(0)
+        self.in_lp = np.zeros(0, dtype=bool)
+        self.age = np.zeros(0, dtype=int) #Consecutive rounds a cut of the LP was slack
+        self.constrs = {} #Pool index -> LP row, for the cuts currently in the LP
+        self.index = {} #Sorted clique -> pool index
+        self.add_cliques(cliques)
+
+    def add_cliques(self, cliques):
+        """Stores the cliques not yet in the pool; returns how many were new."""
+        new = []
+        for clique in cliques:
+            key = tuple(sorted(clique))
+            if key not in self.index:
+                self.index[key] = len(self.index)
+                new.append(key)
+        if not new:
+            return 0
+        lengths = [len(clique) for clique in new]
+        rows = np.repeat(np.arange(len(new)), lengths)
+        cols = np.array([j for clique in new for j in clique], dtype=int)
+        self.rows = vstack([self.rows, csr_matrix((np.ones(len(cols)), (rows, cols)), shape=(len(new), self.num_vars))],
+                           format='csr')
+        self.norms = np.concatenate([self.norms, np.sqrt(np.array(lengths, dtype=float))])
+        self.in_lp = np.concatenate([self.in_lp, np.zeros(len(new), dtype=bool)])
+        self.age = np.concatenate([self.age, np.zeros(len(new), dtype=int)])
+        return len(new)
+
+    def register(self, clique, constr):
+        """Records `constr`, a row of the LP already holding the cut of `clique` (e.g. restored from a checkpoint)."""
+        self.add_cliques([clique])
+        k = self.index[tuple(sorted(clique))]
+        self.constrs[k] = constr
+        self.in_lp[k] = True
+        self.age[k] = 0
+
+    def __len__(self):
+        return self.rows.shape[0]
+
+    def separate(self, model, solution):
+        """Adds the most efficacious cuts violated by `solution` to `model`; returns how many."""
+        violation = self.rows @ solution - 1.0
+        candidates = np.flatnonzero((violation > self.min_violation) & ~self.in_lp)
+        efficacy = violation[candidates] / self.norms[candidates]
+        selected = candidates[np.argsort(-efficacy, kind='stable')[:self.max_cuts_per_round]]
+        variables = model_vars(model)
+        indptr, indices = self.rows.indptr, self.rows.indices
+        for k in selected:
+            cut_vars = [variables[j] for j in indices[indptr[k]:indptr[k + 1]]]
+            self.constrs[k] = model.addLConstr(gp.LinExpr([1.0] * len(cut_vars), cut_vars), GRB.LESS_EQUAL, 1.0)
+        self.in_lp[selected] = True
+        self.age[selected] = 0
+        if len(selected) > 0:
+            model.update()
+        return len(selected)
+
+    def age_cuts(self, model, tol=1e-6):
+        """
+        To be called after the LP of `model` was re-solved: ages the slack cuts of the LP,
+        resets the age of the tight ones and removes those older than max_age. Returns how
+        many cuts were removed.
+        """
+        if not self.constrs:
+            return 0
+        idxs = np.fromiter(self.constrs, dtype=int, count=len(self.constrs))
+        slack = np.array(model.getAttr("Slack", [self.constrs[k] for k in idxs]))
+        self.age[idxs] = np.where(slack > tol, self.age[idxs] + 1, 0)
+        return self._remove(model, idxs[self.age[idxs] > self.max_age])
+
+    def drop_slack(self, model, tol=1e-6):
+        """Removes every cut that is slack at the current LP solution; returns how many."""
+        if not self.constrs:
+            return 0
+        idxs = np.fromiter(self.constrs, dtype=int, count=len(self.constrs))
+        slack = np.array(model.getAttr("Slack", [self.constrs[k] for k in idxs]))
+        return self._remove(model, idxs[slack > tol])
+
+    def _remove(self, model, idxs):
+        if len(idxs) == 0:
+            return 0
+        model.remove([self.constrs.pop(k) for k in idxs])
+        model.update()
+        model._bnb_constrs = None #Row count may match the cached list again after later additions
+        self.in_lp[idxs] = False
+        self.age[idxs] = 0
+        return len(idxs)
@@ -1,5 +1,7 @@
 from itertools import combinations
+import numpy as np
 import networkx as nx
+from scipy.sparse import csr_matrix
 
 def graph_builder(S):
     G = nx.Graph()
@@ -11,3 +13,17 @@ def graph_builder(S):
             G.add_edge(u,v)
     return G
 
+
+
+def conflict_adjacency(G, num_nodes):
+    """
+    Converts the conflict graph G into a symmetric CSR adjacency matrix over num_nodes
+    vertices with sorted neighbor lists, so the neighbors of v are
+    adj.indices[adj.indptr[v]:adj.indptr[v + 1]].
+    """
+    edges = np.array(list(G.edges()), dtype=int).reshape(-1, 2)
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    adj = csr_matrix((np.ones(len(rows), dtype=bool), (rows, cols)), shape=(num_nodes, num_nodes))
+    adj.sort_indices()
+    return adj
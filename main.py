@@ -7,35 +7,14 @@ from collections import Counter
 from reader.reader import MIPInstance
 # --- Pre-solver modules ---
 from presolve.ModelCanonicalizer import ModelCanonicalizer
-from presolve.engine import PresolveEngine
-from presolve.clean_model import CleanModel
-from presolve.singleton_cols import ColSingletonRemover
-from presolve.bound_tightening import BoundTightener
-from presolve.coeff_tightening import CoefficientTightening
-from presolve.dual_fix import DualFix
+from presolve.pipeline import run_presolve
 #--- Solver modules ---
 from bnb.solver import BranchAndBoundSolver
+from bnb.params import SolverParams
+from portfolio import race, PORTFOLIO
 
 
 
-# --- Pre-Solver function ---
-def run_presolve(instance: MIPInstance):
-    """
-    Runs the full presolve pipeline on the given instance,
-    modifying it in place
-    """
-    ModelCanonicalizer().apply(instance)
-    engine = PresolveEngine(instance)
-    engine.register(CleanModel())
-    engine.register(ColSingletonRemover())
-    engine.register(BoundTightener())
-    engine.register(CoefficientTightening())
-    engine.register(DualFix())
-    engine.run()
-    engine.summary()
-    return engine.applied_reductions
-
-
 # --- Solver function ---
 
 def summarize_reductions(applied_reductions):
@@ -62,6 +41,14 @@ def print_summary_comparison(stats_before,stats_after):
     print(f"{'  - Continuous':<18} | {stats_before['cont_vars']:>12} | {stats_after['cont_vars']:>12}")
     print("-" * 50)
 
+def write_solution(path, var_names, solution):
+    """
+    Writes one 'name value' line per variable of the original model
+    """
+    with open(path, 'w') as f:
+        for name, value in zip(var_names, solution):
+            f.write(f"{name} {value:.10g}\n")
+
 def get_stats(instance: MIPInstance)->dict:
     """
     Extracts key statistics from an MIPInstance object
@@ -87,6 +74,19 @@ def main():
     parser.add_argument("--no-cuts", action="store_true", help="Disable clique cuts.")  # ⬅️ ADD THIS
     parser.add_argument("--strong-depth", type=int, default=10, help="Depth for strong branching.")
     parser.add_argument("--strong-k", type=int, default=1500, help="Number of candidates for strong branching.")
+    parser.add_argument("--reliability", type=int, default=None, help="Use reliability branching with this pseudocount threshold.")
+    parser.add_argument("--branching-history", type=str, default=None, help="Load branching history from this .npz file if it exists and save it after solving.")
+    parser.add_argument("--time-limit", type=float, default=600, help="Time limit in seconds.")
+    parser.add_argument("--node-limit", type=int, default=None, help="Maximum number of explored nodes.")
+    parser.add_argument("--gap", type=float, default=1e-3, help="Relative optimality gap to stop at.")
+    parser.add_argument("--abs-gap", type=float, default=1e-6, help="Absolute optimality gap to stop at.")
+    parser.add_argument("--max-open-nodes", type=int, default=None, help="Open-node budget; above it nodes are selected depth-first.")
+    parser.add_argument("--checkpoint", type=str, default=None, help="Periodically save the search state to this .npz file.")
+    parser.add_argument("--resume", action="store_true", help="Resume the search from the --checkpoint file if it exists.")
+    parser.add_argument("--portfolio", type=int, default=0, help="Race this many solver configurations concurrently (0 = single run).")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for the parallel tree search (1 = serial).")
+    parser.add_argument("--strong-workers", type=int, default=1, help="Worker processes for strong branching (1 = serial).")
+    parser.add_argument("--write-solution", type=str, default=None, help="Write the solution in the original variable space to this file.")
     args = parser.parse_args()
 
     # 3. Construct the full path from the folder and filename
@@ -98,8 +98,26 @@ def main():
     if not os.path.exists(full_path):
         print(f"❌ ERROR: File not found at '{full_path}'")
         return
+    params = SolverParams(time_limit=args.time_limit,
+                          node_limit=args.node_limit,
+                          rel_gap=args.gap,
+                          abs_gap=args.abs_gap,
+                          open_node_limit=args.max_open_nodes)
+    if args.portfolio:
+        print(f"🏁 Racing {args.portfolio} solver configurations...")
+        obj_value, solution, winner = race(full_path, PORTFOLIO[:args.portfolio], params=params)
+        if solution is None:
+            print("\n❌ No feasible solution found.")
+            return
+        print(f"Objective value: {obj_value:.6f} (search completed by configuration {winner})")
+        if args.write_solution:
+            write_solution(args.write_solution, MIPInstance(full_path).var_names, solution)
+            print(f"Solution written to {args.write_solution}")
+        return
     instance = MIPInstance(full_path)
     instance.pretty_print()
+    original_var_names = list(instance.var_names)
+    engine = None
 
     #3. PRESOLVE
 
@@ -107,7 +125,7 @@ def main():
         print("⚙️  Starting pre-solver...")
         stats_before = get_stats(instance)
         start_pre_solver_time = time.time()
-        run_presolve(instance)
+        engine = run_presolve(instance)
         total_pre_solver_time = time.time() - start_pre_solver_time
         stats_after = get_stats(instance)
         print(f"Pre-solve complete in {total_pre_solver_time:.2f} seconds")
@@ -123,9 +141,16 @@ def main():
                                   k_plunging=10,
                                   clique_cuts=not args.no_cuts,
                                   strong_depth=args.strong_depth,
-                                  strong_k=args.strong_k)
+                                  strong_k=args.strong_k,
+                                  strong_workers=args.strong_workers,
+                                  reliability=args.reliability,
+                                  branching_history=args.branching_history,
+                                  tree_workers=args.workers,
+                                  checkpoint=args.checkpoint,
+                                  resume=args.resume,
+                                  params=params)
 
-    solution, obj_value, times, primal_bounds, dual_bounds = solver.solve()
+    solution, obj_value, *_ = solver.solve()
 
     # Print results
     if solution is None:
@@ -133,6 +158,11 @@ def main():
     else:
         # print("\n✅ Optimal solution found!")
         print(f"Objective value: {obj_value:.6f}")
+        if engine is not None:
+            solution = engine.postsolve(solution)
+        if args.write_solution:
+            write_solution(args.write_solution, original_var_names, solution)
+            print(f"Solution written to {args.write_solution}")
 
 if __name__ == "__main__":
     main()
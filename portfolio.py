@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import multiprocessing as mp
+from queue import Empty
+import numpy as np
+
+from reader.reader import MIPInstance
+from presolve.ModelCanonicalizer import ModelCanonicalizer
+from presolve.pipeline import run_presolve
+from bnb.solver import BranchAndBoundSolver
+from bnb.params import SolverParams
+
+# Solver configurations raced against each other, in launch order
+PORTFOLIO = [
+    dict(presolve=True, clique_cuts=True, enable_plunging=True, k_plunging=10, strong_depth=10, strong_k=1500),
+    dict(presolve=True, clique_cuts=False, enable_plunging=True, k_plunging=10, reliability=4),
+    dict(presolve=False, clique_cuts=True, enable_plunging=False, strong_depth=10, strong_k=1500),
+    dict(presolve=True, clique_cuts=False, enable_plunging=True, k_plunging=5, strong_depth=3, strong_k=50),
+]
+
+
+class IncumbentChannel:
+    """
+    Incumbent shared by the runs of a race. `value` is the best objective found by any run,
+    in the space of the original model; publish() postsolves a run's solution, recomputes
+    its objective with the original objective and forwards it if it improves the race.
+    """
+    def __init__(self, ctx, obj, obj_const):
+        self._value = ctx.Value('d', float('inf'))
+        self.solutions = ctx.Queue()
+        self.obj = obj
+        self.obj_const = obj_const
+        self.run_idx = None
+        self.postsolve = None
+
+    @property
+    def value(self):
+        return self._value.value
+
+    def attach(self, run_idx, postsolve):
+        """Called inside a run: how its solutions map back to the original variables."""
+        self.run_idx = run_idx
+        self.postsolve = postsolve
+
+    def publish(self, solution):
+        x = np.asarray(self.postsolve(solution), dtype=float)
+        obj_value = float(self.obj @ x) + self.obj_const
+        with self._value.get_lock():
+            if obj_value >= self._value.value:
+                return
+            self._value.value = obj_value
+        self.solutions.put(('incumbent', self.run_idx, obj_value, x))
+
+
+def _race_run(run_idx, path, config, channel, params):
+    sys.stdout = open(os.devnull, 'w')
+    config = dict(config)
+    presolve = config.pop('presolve', True)
+    instance = MIPInstance(path)
+    num_vars = instance.num_vars
+    if presolve:
+        postsolve = run_presolve(instance).postsolve
+    else:
+        ModelCanonicalizer().apply(instance)
+        postsolve = lambda x: np.asarray(x, dtype=float)[:num_vars]
+    channel.attach(run_idx, postsolve)
+    solver = BranchAndBoundSolver(instance, incumbent_channel=channel, params=params, **config)
+    solver.solve()
+    channel.solutions.put(('finished', run_idx, solver.status, None))
+
+
+def race(path, configs=None, params=None, grace=10):
+    """
+    Solves the instance at `path` with several solver configurations concurrently, one
+    process each, all under the limits of `params`. The runs share their incumbents, and
+    the race stops as soon as one run completes its search: 'optimal' and 'infeasible' are
+    proofs of their own, 'cutoff' proves that nothing beats the incumbent another run shared.
+    Runs stop at params.time_limit; the race waits grace seconds longer for their last
+    messages. Returns (objective, solution in the original variables, index of the
+    configuration that finished first or None on timeout).
+    """
+    configs = PORTFOLIO if configs is None else configs
+    params = SolverParams() if params is None else params
+    timeout = params.time_limit + grace
+    original = MIPInstance(path)
+    ctx = mp.get_context("spawn")
+    channel = IncumbentChannel(ctx, np.asarray(original.obj, dtype=float), original.obj_const)
+    runs = [ctx.Process(target=_race_run, args=(idx, path, config, channel, params), daemon=True)
+            for idx, config in enumerate(configs)]
+    for run in runs:
+        run.start()
+
+    best_obj, best_sol, winner = float('inf'), None, None
+    running = len(runs)
+    start_time = time.time()
+    try:
+        while running and time.time() - start_time < timeout:
+            try:
+                kind, run_idx, data, x = channel.solutions.get(timeout=1)
+            except Empty:
+                if not any(run.is_alive() for run in runs):
+                    break
+                continue
+            if kind == 'incumbent':
+                if data < best_obj:
+                    best_obj, best_sol = data, x
+                    print(f"Run {run_idx} found incumbent {best_obj:.5f} after {time.time() - start_time:.2f}s")
+            else:
+                running -= 1
+                print(f"Run {run_idx} finished ({data}) after {time.time() - start_time:.2f}s")
+                if data in ('optimal', 'infeasible', 'cutoff'):
+                    winner = run_idx
+                    break
+        # Incumbents published right before the winner finished may still be queued
+        while True:
+            try:
+                kind, run_idx, data, x = channel.solutions.get(timeout=0.1)
+            except Empty:
+                break
+            if kind == 'incumbent' and data < best_obj:
+                best_obj, best_sol = data, x
+    finally:
+        for run in runs:
+            if run.is_alive():
+                run.terminate()
+            run.join()
+    return best_obj, best_sol, winner
@@ -1,18 +1,20 @@
 from typing import List
 import numpy as np
+import scipy.sparse as sp
 
 class ModelCanonicalizer:
     def __init__(self):
         self.name="ModelCanonicalizer"
 
     def apply(self,instance):
-        A=instance.A
         b=instance.b
         sense=instance.sense
         row_names=instance.row_names
 
-        for i in range(len(sense)):
-            if sense[i]=='G':
-                A[i,:] *=-1
-                b[i]*=-1
-                sense[i]='L'
\ No newline at end of file
+        flip=np.array([s=='G' for s in sense],dtype=bool)
+        if not flip.any():
+            return
+        instance.A=sp.diags(np.where(flip,-1.0,1.0))@instance.A
+        b[flip]*=-1
+        for i in np.flatnonzero(flip):
+            sense[i]='L'
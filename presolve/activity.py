@@ -0,0 +1,118 @@
+import numpy as np
+
+
+def _contributions(coeffs, lb, ub):
+    """Smallest and largest value of a_ij * x_j over lb_j <= x_j <= ub_j, elementwise."""
+    positive = coeffs > 0
+    lo = np.where(positive, coeffs * lb, coeffs * ub)
+    hi = np.where(positive, coeffs * ub, coeffs * lb)
+    return lo, hi
+
+
+class ActivityBounds:
+    """
+    Minimum and maximum activity of every row of A under the current variable bounds.
+
+    Infinite contributions are not summed: each row keeps the finite part of its
+    activity plus a count of the variables that make it infinite, so that a single
+    bound change can be applied (or undone) incrementally and the residual activity
+    of a row without one of its variables stays finite when that variable is the only
+    unbounded one.
+    """
+    def __init__(self, instance):
+        self.instance = instance
+        self.recompute()
+
+    def recompute(self):
+        """Computes the activities of all rows in one pass over the nonzeros of A."""
+        A = self.instance.A
+        self.matrix = A
+        num_rows = A.shape[0]
+        rows = np.repeat(np.arange(num_rows), np.diff(A.indptr))
+        lo, hi = _contributions(A.data, self.instance.lb[A.indices], self.instance.ub[A.indices])
+        lo_inf = np.isinf(lo)
+        hi_inf = np.isinf(hi)
+        self.min_finite = np.bincount(rows, weights=np.where(lo_inf, 0.0, lo), minlength=num_rows)
+        self.max_finite = np.bincount(rows, weights=np.where(hi_inf, 0.0, hi), minlength=num_rows)
+        self.min_inf = np.bincount(rows[lo_inf], minlength=num_rows)
+        self.max_inf = np.bincount(rows[hi_inf], minlength=num_rows)
+
+    def recompute_rows(self, row_idxs):
+        """Recomputes the activities of the given rows, e.g. after their coefficients changed."""
+        A = self.instance.A
+        lb = self.instance.lb
+        ub = self.instance.ub
+        for i in np.unique(row_idxs):
+            cols, vals = self.instance.row_entries(i)
+            lo, hi = _contributions(vals, lb[cols], ub[cols])
+            self.min_finite[i] = lo[np.isfinite(lo)].sum()
+            self.max_finite[i] = hi[np.isfinite(hi)].sum()
+            self.min_inf[i] = np.count_nonzero(np.isinf(lo))
+            self.max_inf[i] = np.count_nonzero(np.isinf(hi))
+        self.matrix = A
+
+    @property
+    def min_activity(self):
+        return np.where(self.min_inf > 0, -np.inf, self.min_finite)
+
+    @property
+    def max_activity(self):
+        return np.where(self.max_inf > 0, np.inf, self.max_finite)
+
+    def residual_min_activity(self, rows, coeffs, lb, ub):
+        """
+        Minimum activity of each row in `rows` without the term a_ij * x_j, for parallel
+        arrays of coefficients and bounds (one entry per nonzero).
+        """
+        lo, _ = _contributions(coeffs, lb, ub)
+        lo_inf = np.isinf(lo)
+        inf_left = self.min_inf[rows] - lo_inf
+        finite_left = self.min_finite[rows] - np.where(lo_inf, 0.0, lo)
+        return np.where(inf_left > 0, -np.inf, finite_left)
+
+    def update_bound(self, j, old_lb, old_ub, new_lb, new_ub):
+        """Updates the rows containing variable j after its bounds changed."""
+        rows, vals = self.instance.col_entries(j)
+        if len(rows) == 0:
+            return
+        self._add_column(rows, vals, old_lb, old_ub, -1)
+        self._add_column(rows, vals, new_lb, new_ub, 1)
+
+    def remove_column(self, j):
+        """Drops the contributions of variable j, e.g. before it is fixed or removed."""
+        rows, vals = self.instance.col_entries(j)
+        if len(rows) == 0:
+            return
+        self._add_column(rows, vals, self.instance.lb[j], self.instance.ub[j], -1)
+
+    def remove_rows(self, keep):
+        """Compacts the activity arrays to the rows selected by the boolean mask `keep`."""
+        self.min_finite = self.min_finite[keep]
+        self.max_finite = self.max_finite[keep]
+        self.min_inf = self.min_inf[keep]
+        self.max_inf = self.max_inf[keep]
+
+    def rebind(self, matrix):
+        """Marks the activities as consistent with `matrix` after a structural edit was tracked."""
+        self.matrix = matrix
+
+    def _add_column(self, rows, vals, lb, ub, sign):
+        lo, hi = _contributions(vals, np.full(len(vals), lb), np.full(len(vals), ub))
+        lo_inf = np.isinf(lo)
+        hi_inf = np.isinf(hi)
+        self.min_finite[rows] += sign * np.where(lo_inf, 0.0, lo)
+        self.max_finite[rows] += sign * np.where(hi_inf, 0.0, hi)
+        self.min_inf[rows] += sign * lo_inf
+        self.max_inf[rows] += sign * hi_inf
+
+
+def activity_bounds(instance) -> ActivityBounds:
+    """
+    Returns the activity bounds shared by the presolvers of `instance`, rebuilding them
+    if the constraint matrix was replaced by something that did not keep them up to date.
+    """
+    activity = instance.activity
+    if activity is None or activity.matrix is not instance.A:
+        activity = ActivityBounds(instance)
+        instance.activity = activity
+    return activity
@@ -1,11 +1,20 @@
 from abc import ABC, abstractmethod
 from typing import List
 
+class InfeasibleModel(Exception):
+    """Raised by presolve once it proves the model infeasible (or, in the dual fix check, unbounded)."""
+    pass
+
+
 class Reduction:
-    def __init__(self, kind: str, target: str, value):
+    def __init__(self, kind: str, target, value, index=None):
         self.kind = kind
         self.target = target
         self.value = value
+        # Position of the target in the model the presolver looked at: a column index for
+        # variable reductions, a row index for constraint reductions and (row, column) for
+        # coefficient reductions. Stays valid until the engine compacts the model.
+        self.index = index
 
     def __repr__(self):
         return f"Reduction(kind={self.kind}, target={self.target}, value={self.value})"
@@ -17,5 +26,10 @@ class Presolver(ABC):
         self.name = name
 
     @abstractmethod
-    def apply(self, instance) -> List[Reduction]:
-        pass
\ No newline at end of file
+    def apply(self, instance, rows=None, cols=None) -> List[Reduction]:
+        """
+        Returns the reductions found on `instance`. `rows` and `cols` are the indices of the
+        rows and columns touched since this presolver last ran (None means all of them);
+        presolvers only need to examine those.
+        """
+        pass
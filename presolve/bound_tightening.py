@@ -1,4 +1,5 @@
 from presolve.base import Presolver, Reduction
+from presolve.activity import activity_bounds
 from typing import List
 import numpy as np
 
@@ -7,42 +8,34 @@ class BoundTightener(Presolver):
         super().__init__("BoundTightener")
         self.epsilon = epsilon
 
-    def apply(self, instance) -> List[Reduction]:
+    def apply(self, instance, rows=None, cols=None) -> List[Reduction]:
         A = instance.A
         rhs = instance.b
-        sense = instance.sense
+        sense = np.asarray(instance.sense)
         lb = instance.lb
         ub = instance.ub
         var_names = instance.var_names
-        var_types = instance.var_types
-        row_names = instance.row_names
+        activity = activity_bounds(instance)
         reductions = []
-        for i in range(A.shape[0]):
-            row_sense = sense[i]
-            if row_sense == 'L':
-                row = A[i, :]
-                row_rhs = rhs[i]
-                min_activity = 0.0
-                max_activity = 0.0
-                for j in range(A.shape[1]):
-                    coeff = row[j]
-                    if coeff > 0:
-                        min_activity += coeff * lb[j]
-                        max_activity += coeff * ub[j]
-                    elif coeff < 0:
-                        min_activity += coeff * ub[j]
-                        max_activity += coeff * lb[j]
-                for j in range(A.shape[1]):
-                    coeff = row[j]
-                    if coeff == 0:
-                        continue
-                    x_name = var_names[j]
-                    if coeff > 0:
-                        new_ub = (row_rhs - (min_activity - coeff * lb[j])) / coeff
-                        if new_ub < ub[j] - self.epsilon:
-                            reductions.append(Reduction('tighten_bound', x_name, (lb[j], new_ub)))
-                    elif coeff < 0:
-                        new_lb = (row_rhs - (min_activity - coeff * ub[j])) / coeff
-                        if new_lb > lb[j] + self.epsilon:
-                            reductions.append(Reduction('tighten_bound', x_name, (new_lb, ub[j])))
+
+        # One entry per nonzero of a 'L' row: a_ij * x_j <= b_i - (min activity of the rest of row i)
+        nz_rows, nz_cols, coeffs, _ = instance.rows_nonzeros(rows)
+        in_le_row = sense[nz_rows] == 'L'
+        nz_rows = nz_rows[in_le_row]
+        nz_cols = nz_cols[in_le_row]
+        coeffs = coeffs[in_le_row]
+        residual = activity.residual_min_activity(nz_rows, coeffs, lb[nz_cols], ub[nz_cols])
+        with np.errstate(invalid='ignore'):
+            implied = (rhs[nz_rows] - residual) / coeffs
+
+        # Keep only the tightest implied bound per variable
+        new_ub = np.full(len(var_names), np.inf)
+        new_lb = np.full(len(var_names), -np.inf)
+        np.fmin.at(new_ub, nz_cols[coeffs > 0], implied[coeffs > 0])
+        np.fmax.at(new_lb, nz_cols[coeffs < 0], implied[coeffs < 0])
+
+        for j in np.flatnonzero(new_ub < ub - self.epsilon):
+            reductions.append(Reduction('tighten_bound', var_names[j], (lb[j], new_ub[j]), index=j))
+        for j in np.flatnonzero(new_lb > lb + self.epsilon):
+            reductions.append(Reduction('tighten_bound', var_names[j], (new_lb[j], ub[j]), index=j))
         return reductions
@@ -1,5 +1,6 @@
 
-from presolve.base import Presolver, Reduction
+from presolve.base import Presolver, Reduction, InfeasibleModel
+from presolve.activity import activity_bounds
 from typing import List
 import numpy as np
 
@@ -9,7 +10,7 @@ class CleanModel(Presolver):
         self.epsilon = epsilon
         self.psi = psi
 
-    def apply(self, instance) -> List[Reduction]:
+    def apply(self, instance, rows=None, cols=None) -> List[Reduction]:
         A = instance.A
         b = instance.b
         sense = instance.sense
@@ -18,110 +19,120 @@ class CleanModel(Presolver):
         var_names = instance.var_names
         row_names = instance.row_names
         reductions = []
-        i=0
-        while i<instance.A.shape[0]:
-            row = A[i, :] #extract that row
+        activity = activity_bounds(instance)
+        activity_min = activity.min_activity
+        activity_max = activity.max_activity
+        row_idxs = np.arange(A.shape[0]) if rows is None else np.asarray(rows, dtype=int)
+        col_idxs = np.arange(A.shape[1]) if cols is None else np.asarray(cols, dtype=int)
+
+        # Only empty rows, singleton rows and redundant/infeasible rows need a closer look
+        row_nnz = np.diff(A.indptr)[row_idxs]
+        row_sense = np.asarray(sense)[row_idxs]
+        row_rhs = b[row_idxs]
+        row_min = activity_min[row_idxs]
+        row_max = activity_max[row_idxs]
+        with np.errstate(invalid='ignore'):
+            le_flagged = (row_sense == 'L') & ((row_rhs >= self.psi) | (row_max <= row_rhs + self.epsilon) |
+                                                (row_min >= row_rhs + self.epsilon))
+            eq_flagged = (row_sense == 'E') & ((row_min > row_rhs + self.epsilon) | (row_max < row_rhs - self.epsilon) |
+                                                ((np.abs(row_min - row_rhs) <= self.epsilon) &
+                                                 (np.abs(row_max - row_rhs) <= self.epsilon)))
+        flagged = (row_nnz <= 1) | le_flagged | eq_flagged
+
+        for i in row_idxs[flagged]:
+            nz, coeffs = instance.row_entries(i) #extract the nonzero indices and coefficients of that row
             s = sense[i] #extract the sense
             rhs = b[i] #extract the RHS
             name = row_names[i] #extract the name
-            nz = np.nonzero(row)[0]  # this returns the indices where this row in non-null
             if len(nz) == 0:
                 if s=='L':
                     if rhs>=0:
-                        reductions.append(Reduction('remove_constraint', name,None))
+                        reductions.append(Reduction('remove_constraint', name, None, index=i))
                         # print(f"Remove constraint comes from CleanModel empty row (0 <5) at {name}")
                     else:
-                        raise Exception(f"Infeasible model. empty = constraint: 0 = {rhs} in {name}")
+                        raise InfeasibleModel(f"Infeasible model. empty = constraint: 0 = {rhs} in {name}")
                 elif s=='E':
                     if abs(rhs)<=self.epsilon:
-                        reductions.append(Reduction('remove_constraint', name,None))
+                        reductions.append(Reduction('remove_constraint', name, None, index=i))
                         # print(f"Remove constraint comes from CleanModel empty row (0=0) at {name}")
                     else:
-                        raise Exception(f"Infeasible model. empty = constraint: 0 = {rhs} in {name}")
-                i += 1
+                        raise InfeasibleModel(f"Infeasible model. empty = constraint: 0 = {rhs} in {name}")
                 continue
             if len(nz) == 1: #just if there is only one coefficient
                 j = nz[0]  # j assumes the value of this very index
                 vname=var_names[j]
-                coeff = row[j]  # now we take the coefficient itself
+                coeff = coeffs[0]  # now we take the coefficient itself
                 if s=='L':
                     if coeff > 0:
                         new_ub = rhs / coeff
-                        reductions.append(Reduction('remove_constraint', name, None))
+                        reductions.append(Reduction('remove_constraint', name, None, index=i))
                         # print(f"Remove constraint comes from CleanModel empty row, have a new upper bound for {vname} the coeff at {name}")
                         if new_ub < ub[j]:
-                            reductions.append(Reduction('tighten_bound', vname, (lb[j], new_ub)))
+                            reductions.append(Reduction('tighten_bound', vname, (lb[j], new_ub), index=j))
                             # print("And indeed we are correcting this bound")
                         elif new_ub < lb[j]:
-                            raise Exception(f"Infeasible model. Constraint and bound of variable {vname} dont match")
+                            raise InfeasibleModel(f"Infeasible model. Constraint and bound of variable {vname} dont match")
                     elif coeff < 0:
                         new_lb = rhs / coeff
-                        reductions.append(Reduction('remove_constraint', name, None))
+                        reductions.append(Reduction('remove_constraint', name, None, index=i))
                         # print(f"Remove constraint comes from CleanModel empty row, have a new lower bound for {vname} the coeff at {name}")
                         if new_lb > lb[j]:
-                            reductions.append(Reduction('tighten_bound', vname, (new_lb, ub[j])))
+                            reductions.append(Reduction('tighten_bound', vname, (new_lb, ub[j]), index=j))
                             # print("And indeed we are correcting this bound")
                         elif new_lb > ub[j]:
-                            raise Exception(f"Infeasible model. Constraint and bound of variable {vname} dont match")
+                            raise InfeasibleModel(f"Infeasible model. Constraint and bound of variable {vname} dont match")
                 elif s=='E':
                     fixed_value = rhs / coeff
-                    reductions.append(Reduction('remove_constraint', name, None))
+                    reductions.append(Reduction('remove_constraint', name, None, index=i))
                     # print(f"remove constraint from clean_model because we fix equality at {name}")
 
                     if fixed_value < lb[j] or fixed_value > ub[j]:
-                        raise Exception(f"Infeasible model. Equality requires {vname} = {fixed_value}, "
+                        raise InfeasibleModel(f"Infeasible model. Equality requires {vname} = {fixed_value}, "
                                         f"but bounds are [{lb[j]}, {ub[j]}]")
                     else:
-                        reductions.append(Reduction('fix_variable', vname, fixed_value))
+                        reductions.append(Reduction('fix_variable', vname, fixed_value, index=j))
 
-                i+=1
                 continue
             # Redundant or infeasible rows
-            activity_min = np.sum([row[j] * (ub[j] if row[j] < 0 else lb[j]) for j in nz])
-            activity_max = np.sum([row[j] * (lb[j] if row[j] < 0 else ub[j]) for j in nz])
-
             if s == 'L':
-                if rhs >= self.psi or activity_max <= rhs + self.epsilon:
-                    reductions.append(Reduction('remove_constraint', name, None))
+                if rhs >= self.psi or activity_max[i] <= rhs + self.epsilon:
+                    reductions.append(Reduction('remove_constraint', name, None, index=i))
                     # print("remove constraint from clean_model because it is unbounded")
-                elif activity_min >= rhs + self.epsilon:
-                    raise Exception(f"Infeasible row detected: {name}")
+                elif activity_min[i] >= rhs + self.epsilon:
+                    raise InfeasibleModel(f"Infeasible row detected: {name}")
             elif s == 'E':
-                if (activity_min > rhs + self.epsilon) or (activity_max < rhs - self.epsilon):
-                    raise Exception(f"Infeasible equality: {name}")
-                elif abs(activity_min - rhs) <= self.epsilon and abs(activity_max - rhs) <= self.epsilon:
-                    reductions.append(Reduction('remove_constraint', name, None))
+                if (activity_min[i] > rhs + self.epsilon) or (activity_max[i] < rhs - self.epsilon):
+                    raise InfeasibleModel(f"Infeasible equality: {name}")
+                elif abs(activity_min[i] - rhs) <= self.epsilon and abs(activity_max[i] - rhs) <= self.epsilon:
+                    reductions.append(Reduction('remove_constraint', name, None, index=i))
                     # print("remove constraint from clean_model because it is unbounded")
-            i+=1
 
         # Fix variables where lb ≈ ub
 
-        for name, l, u in zip(var_names,lb,ub):
-            if abs(l - u) < self.epsilon:
-                reductions.append(Reduction('fix_variable', name, l))
+        for j in col_idxs[np.abs(lb[col_idxs] - ub[col_idxs]) < self.epsilon]:
+            reductions.append(Reduction('fix_variable', var_names[j], lb[j], index=j))
 
-        for j in range(len(var_names)):
-            column=A[:,j]
-            column_nmz = np.count_nonzero(column, axis=0)
+        column_nnz = np.diff(instance.A_csc.indptr)[col_idxs]
+        for j in col_idxs[column_nnz == 0]:
             vname = var_names[j]
             coef = instance.obj[j]
-            if column_nmz == 0:
-                if abs(coef)<self.epsilon:
-                    #print(f"f    removing unused variable {vname}")
-                    reductions.append(Reduction('remove_variable', vname, None))
-                    # print("Remove variable comes from clean_model")
-                elif coef>0:
-                    fix_val=lb[j]
-                    #print(f"    Fixing objective-only variable {vname} = {fix_val} (obj>0)")
-                    reductions.append(Reduction(kind='fix_variable', target=vname, value=fix_val))
-                else:
-                    fix_val=ub[j]
-                    #print(f"    Fixing objective-only variable {vname} = {fix_val} (obj<0)")
-                    reductions.append(Reduction(kind='fix_variable', target=vname, value=fix_val))
+            if abs(coef)<self.epsilon:
+                #print(f"f    removing unused variable {vname}")
+                reductions.append(Reduction('remove_variable', vname, None, index=j))
+                # print("Remove variable comes from clean_model")
+            elif coef>0:
+                fix_val=lb[j]
+                #print(f"    Fixing objective-only variable {vname} = {fix_val} (obj>0)")
+                reductions.append(Reduction(kind='fix_variable', target=vname, value=fix_val, index=j))
+            else:
+                fix_val=ub[j]
+                #print(f"    Fixing objective-only variable {vname} = {fix_val} (obj<0)")
+                reductions.append(Reduction(kind='fix_variable', target=vname, value=fix_val, index=j))
 
 
         # Ensure integral bounds for integer variables
-        for j, (vtype, name) in enumerate(zip(instance.var_types, var_names)):
+        for j in col_idxs:
+            vtype, name = instance.var_types[j], var_names[j]
             if vtype in ('I', 'B'):  # Integer or Binary
                 orig_lb = lb[j]
                 orig_ub = ub[j]
@@ -131,19 +142,14 @@ class CleanModel(Presolver):
 
                 # Infeasibility check after rounding
                 if int_lb > int_ub + self.epsilon:
-                    raise Exception(f"Infeasible integer bounds for variable {name} after rounding.")
+                    raise InfeasibleModel(f"Infeasible integer bounds for variable {name} after rounding.")
 
-                changed = False
-                if abs(orig_lb - int_lb) > self.epsilon:
-                    lb[j] = int_lb
-                    changed = True
-                if abs(orig_ub - int_ub) > self.epsilon:
-                    ub[j] = int_ub
-                    changed = True
+                new_lb = int_lb if abs(orig_lb - int_lb) > self.epsilon else orig_lb
+                new_ub = int_ub if abs(orig_ub - int_ub) > self.epsilon else orig_ub
 
-                if changed:
+                if new_lb != orig_lb or new_ub != orig_ub:
                     #print(f"    Adjusted bounds for integer variable {name}: [{orig_lb}, {orig_ub}] → [{int_lb}, {int_ub}]")
-                    reductions.append(Reduction('tighten_bound', name, (lb[j], ub[j])))
+                    reductions.append(Reduction('tighten_bound', name, (new_lb, new_ub), index=j))
                     # print("We are calling bound tightening from clean_model")
 
 
@@ -1,4 +1,5 @@
 from presolve.base import Presolver, Reduction
+from presolve.activity import activity_bounds
 from typing import List
 import numpy as np
 
@@ -6,48 +7,39 @@ class CoefficientTightening(Presolver):
     def __init__(self):
         super().__init__("CoefficientTightening")
 
-    def apply(self, instance) -> List[Reduction]:
+    def apply(self, instance, rows=None, cols=None) -> List[Reduction]:
         A = instance.A
-        sense = instance.sense
+        sense = np.asarray(instance.sense)
         rhs = instance.b
         lb = instance.lb
         ub = instance.ub
         reductions = []
         row_names = instance.row_names
         var_names = instance.var_names
+        activity = activity_bounds(instance)
 
-        for i in range(A.shape[0]):
-            row = A[i, :]
-            row_sense = sense[i]
-            row_rhs = rhs[i]
-            if row_sense !='L':
-                continue
-            activity_min = 0.0
-            activity_max = 0.0
-            for j in range(len(var_names)):
-                a_ij = row[j]
-                if a_ij > 0:
-                    activity_min += a_ij * lb[j]
-                    activity_max += a_ij * ub[j]
-                elif a_ij < 0:
-                    activity_min += a_ij * ub[j]
-                    activity_max += a_ij * lb[j]
-            for j in np.nonzero(row)[0]:
-                a_ij = row[j]
-                if instance.var_types[j] not in ['I', 'B']:
-                    continue
-                xj = var_names[j]
-                old_aij = a_ij
-                if a_ij > 0 and ub[j] < 1e20:
-                    slack = row_rhs - activity_max - a_ij * (ub[j]-1)
-                    new_aij = min(a_ij, a_ij-slack)
-                elif a_ij < 0 and lb[j] > -1e20:
-                    slack = row_rhs - activity_max - a_ij * (lb[j]+1)
-                    new_aij= max(a_ij, a_ij+slack)
-                else:
-                    continue
-                if abs(new_aij - a_ij) > 1e-6:
-                    A[i, j] = new_aij
-                    reductions.append(Reduction('tighten_coefficient', (row_names[i], xj), (old_aij, new_aij)))
-        return reductions
+        is_int = np.array([vtype in ('I', 'B') for vtype in instance.var_types], dtype=bool)
+        nz_rows, nz_cols, a, positions = instance.rows_nonzeros(rows)
+        activity_max = activity.max_activity[nz_rows]
+        row_rhs = rhs[nz_rows]
+        candidate = (sense[nz_rows] == 'L') & is_int[nz_cols]
+        up = candidate & (a > 0) & (ub[nz_cols] < 1e20)
+        down = candidate & (a < 0) & (lb[nz_cols] > -1e20)
+
+        new_a = a.copy()
+        with np.errstate(invalid='ignore'):
+            slack_up = row_rhs[up] - activity_max[up] - a[up] * (ub[nz_cols[up]] - 1)
+            new_a[up] = np.minimum(a[up], a[up] - slack_up)
+            slack_down = row_rhs[down] - activity_max[down] - a[down] * (lb[nz_cols[down]] + 1)
+            new_a[down] = np.maximum(a[down], a[down] + slack_down)
+        changed = np.flatnonzero(np.abs(new_a - a) > 1e-6)
 
+        for k in changed:
+            reductions.append(Reduction('tighten_coefficient', (row_names[nz_rows[k]], var_names[nz_cols[k]]), (a[k], new_a[k]),
+                                        index=(nz_rows[k], nz_cols[k])))
+        if len(changed):
+            A.data[positions[changed]] = new_a[changed]
+            A.eliminate_zeros()
+            instance.invalidate_columns()
+            activity.recompute_rows(nz_rows[changed])
+        return reductions
@@ -1,4 +1,4 @@
-from presolve.base import Presolver, Reduction
+from presolve.base import Presolver, Reduction, InfeasibleModel
 from typing import List
 import numpy as np
 
@@ -7,7 +7,7 @@ class DualFix(Presolver):
         super().__init__("DualFix")
         self.epsilon = epsilon
 
-    def apply(self, instance) -> List[Reduction]:
+    def apply(self, instance, rows=None, cols=None) -> List[Reduction]:
         A = instance.A
         rhs=instance.b
         c=instance.obj
@@ -17,33 +17,31 @@ class DualFix(Presolver):
         var_names=instance.var_names
         row_names=instance.row_names
         reductions = []
-        for j in range(A.shape[1]):
-            col=A[:,j]
+        for j in (range(A.shape[1]) if cols is None else cols):
+            row_idxs,col_filtered=instance.col_entries(j)
             vname=var_names[j]
             obj_coef=c[j]
-            row_idxs=np.nonzero(col)[0]
             senses_involved=set(sense[i] for i in row_idxs)
             if not senses_involved.issubset({'L'}):
                 continue
-            col_filtered=col[row_idxs]
             if np.all(col_filtered>=0) and obj_coef>=0:
                 if lb[j]>-np.inf:
-                    reductions.append(Reduction('fix variable',vname,lb[j]))
+                    reductions.append(Reduction('fix variable',vname,lb[j],index=j))
                 elif obj_coef-self.epsilon>0:
-                    raise Exception("Your problem is unbounded or infeasible (Dual Fix check)")
+                    raise InfeasibleModel("Your problem is unbounded or infeasible (Dual Fix check)")
                 elif abs(obj_coef)<self.epsilon:
-                    reductions.append(Reduction('remove_variable', vname, None))
+                    reductions.append(Reduction('remove_variable', vname, None, index=j))
                     for i in row_idxs:
                         cname=row_names[i]
-                        reductions.append(Reduction('remove_constraint', cname, None))
+                        reductions.append(Reduction('remove_constraint', cname, None, index=i))
             elif np.all(col_filtered<=0) and obj_coef<=0:
                 if ub[j]<np.inf:
-                    reductions.append(Reduction('fix variable',vname,ub[j]))
+                    reductions.append(Reduction('fix variable',vname,ub[j],index=j))
                 elif obj_coef+self.epsilon<0:
-                    raise Exception("Your problem is unbounded or infeasible (Dual Fix check)")
+                    raise InfeasibleModel("Your problem is unbounded or infeasible (Dual Fix check)")
                 elif abs(obj_coef)<self.epsilon:
-                    reductions.append(Reduction('remove_variable', vname, None))
+                    reductions.append(Reduction('remove_variable', vname, None, index=j))
                     for i in row_idxs:
                         cname=row_names[i]
-                        reductions.append(Reduction('remove_constraint', cname, None))
+                        reductions.append(Reduction('remove_constraint', cname, None, index=i))
         return reductions
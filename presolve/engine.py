@@ -1,108 +1,345 @@
 from typing import List
 from collections import Counter
-from presolve.base import Presolver, Reduction
+import time
+from presolve.base import Presolver, Reduction, InfeasibleModel
+from presolve.postsolve import PostsolveStack
 import numpy as np
 
+class PresolverStats:
+    def __init__(self, time_budget=None):
+        self.time_budget = time_budget  # seconds over the whole run, None for unlimited
+        self.calls = 0
+        self.time = 0.0
+        self.rows_examined = 0
+        self.cols_examined = 0
+        self.found = 0
+        self.applied = 0
+
+    @property
+    def exhausted(self):
+        return self.time_budget is not None and self.time >= self.time_budget
+
+
 class PresolveEngine:
     def __init__(self, instance):
         self.instance = instance
         self.presolvers: List[Presolver] = []
         self.applied_reductions: List[Reduction] = []
+        self.stats = {}
+
+        # Rows/columns touched by applied reductions since each presolver last ran, keyed by presolver name
+        self.dirty_rows = None
+        self.dirty_cols = None
 
-    def register(self, presolver: Presolver):
+        # Deferred deletions: rows/columns are only marked while a round is running and
+        # dropped together by compact(), so reduction indices stay valid for the whole round
+        self.row_keep = None
+        self.col_keep = None
+        self.fixed_values = None
+        self.col_fixed = None
+        self._row_index = None
+        self._col_index = None
+
+        # Original index of every column still in the model, and how to recover the others
+        self.col_origin = np.arange(instance.num_vars)
+        self.postsolve_stack = PostsolveStack(instance.var_names, instance.var_types)
+
+    def register(self, presolver: Presolver, time_budget=None):
         self.presolvers.append(presolver)
+        self.stats[presolver.name] = PresolverStats(time_budget)
 
     def run(self, max_rounds: int = 10):
+        """
+        Runs the presolvers in rounds. Every presolver only sees the rows and columns touched
+        by reductions applied since its previous call, so late rounds cost proportional to
+        what changed. Stops when nothing is left to examine, after max_rounds, or once every
+        presolver has used up its time budget.
+        """
+        self.dirty_rows = {p.name: np.ones(self.instance.num_constraints, dtype=bool) for p in self.presolvers}
+        self.dirty_cols = {p.name: np.ones(self.instance.num_vars, dtype=bool) for p in self.presolvers}
         round_count = 0
-        changed = True
-        while changed and round_count < max_rounds:
-            changed = False
+        while round_count < max_rounds and self._has_pending_work():
             round_count += 1
             # print(f"Presolve Round {round_count}")
             for presolver in self.presolvers:
-                reductions = presolver.apply(self.instance)
+                stats = self.stats[presolver.name]
+                if stats.exhausted:
+                    continue
+                rows = np.flatnonzero(self.dirty_rows[presolver.name])
+                cols = np.flatnonzero(self.dirty_cols[presolver.name])
+                if len(rows) == 0 and len(cols) == 0:
+                    continue
+                self.dirty_rows[presolver.name][:] = False
+                self.dirty_cols[presolver.name][:] = False
+
+                start = time.time()
+                reductions = presolver.apply(self.instance, rows=rows, cols=cols)
+                applied_before = len(self.applied_reductions)
                 if reductions:
                     self._apply_reductions(reductions)
-                    changed = True
+                stats.calls += 1
+                stats.time += time.time() - start
+                stats.rows_examined += len(rows)
+                stats.cols_examined += len(cols)
+                stats.found += len(reductions)
+                stats.applied += len(self.applied_reductions) - applied_before
+            self.compact()
+        self.dirty_rows = None
+        self.dirty_cols = None
+
+    def _has_pending_work(self):
+        return any(not self.stats[p.name].exhausted and
+                   (self.dirty_rows[p.name].any() or self.dirty_cols[p.name].any())
+                   for p in self.presolvers)
+
+    def _mark_rows(self, rows):
+        if self.dirty_rows is not None:
+            for mask in self.dirty_rows.values():
+                mask[rows] = True
+
+    def _mark_cols(self, cols):
+        if self.dirty_cols is not None:
+            for mask in self.dirty_cols.values():
+                mask[cols] = True
+
+    def _mark_neighbourhood(self, col_idx):
+        """Marks the rows containing a column and every column sharing one of those rows."""
+        rows, _ = self.instance.col_entries(col_idx)
+        self._mark_rows(rows)
+        if self.dirty_cols is not None and len(rows):
+            _, cols, _, _ = self.instance.rows_nonzeros(rows)
+            self._mark_cols(cols)
+
+    def _begin_round(self):
+        if self.row_keep is not None:
+            return
+        self.row_keep = np.ones(self.instance.num_constraints, dtype=bool)
+        self.col_keep = np.ones(self.instance.num_vars, dtype=bool)
+        self.fixed_values = np.zeros(self.instance.num_vars)
+        self.col_fixed = np.zeros(self.instance.num_vars, dtype=bool) #Columns fixed this round, still in A
+        self._row_index = None
+        self._col_index = None
+
+    def compact(self):
+        """
+        Removes every row and column marked during the round with a single copy of the model.
+        Fixed columns are moved to the right-hand side before they are dropped.
+        """
+        if self.row_keep is None:
+            return
+        instance = self.instance
+        if not self.col_keep.all():
+            instance.b -= instance.A @ self.fixed_values
+        if not (self.row_keep.all() and self.col_keep.all()):
+            activity = self._activity()
+            instance.compact(self.row_keep, self.col_keep)
+            self.col_origin = self.col_origin[self.col_keep]
+            if self.dirty_rows is not None:
+                for name in self.dirty_rows:
+                    self.dirty_rows[name] = self.dirty_rows[name][self.row_keep]
+                    self.dirty_cols[name] = self.dirty_cols[name][self.col_keep]
+            if activity is not None:
+                activity.recompute()
+        self.row_keep = None
+        self.col_keep = None
+        self.fixed_values = None
+        self.col_fixed = None
+
+    def _column(self, r: Reduction, name):
+        if r.index is not None:
+            return r.index[1] if r.kind == 'tighten_coefficient' else r.index
+        return self._column_by_name(name)
+
+    def _column_by_name(self, name):
+        if self._col_index is None:
+            self._col_index = {vname: j for j, vname in enumerate(self.instance.var_names)}
+        return self._col_index.get(name)
+
+    def _row(self, r: Reduction, name):
+        if r.index is not None:
+            return r.index[0] if r.kind == 'tighten_coefficient' else r.index
+        if self._row_index is None:
+            self._row_index = {cname: i for i, cname in enumerate(self.instance.row_names)}
+        return self._row_index.get(name)
 
     def _apply_reductions(self, reductions: List[Reduction]):
+        self._begin_round()
+        instance = self.instance
         for r in reductions:
             if r.kind == 'tighten_bound':
                 vname=r.target
-                try:
-                    idx=self.instance.var_names.index(vname)
-                    old_lb,old_ub=self.instance.lb[idx],self.instance.ub[idx]
-                    new_lb,new_ub=r.value
-                    if new_lb > new_ub + 1e-6:
-                        raise Exception(f"Infeasible tightening for {vname}: [{new_lb}, {new_ub}]")
-                    if new_lb > old_lb + 1e-6 or new_ub < old_ub - 1e-6:
-                        self.instance.lb[idx] = max(old_lb, new_lb)
-                        self.instance.ub[idx] = min(old_ub, new_ub)
-                        self.applied_reductions.append(r)
-                except ValueError:
+                idx=self._column(r, vname)
+                if idx is None:
                     print(f"    Failed to tighten bounds for {vname}: not found")
+                    continue
+                if not self.col_keep[idx]:
+                    continue
+                old_lb,old_ub=instance.lb[idx],instance.ub[idx]
+                new_lb,new_ub=r.value
+                if new_lb > new_ub + 1e-6:
+                    raise InfeasibleModel(f"Infeasible tightening for {vname}: [{new_lb}, {new_ub}]")
+                if new_lb > old_lb + 1e-6 or new_ub < old_ub - 1e-6:
+                    instance.lb[idx] = max(old_lb, new_lb)
+                    instance.ub[idx] = min(old_ub, new_ub)
+                    activity = self._activity()
+                    if activity is not None:
+                        activity.update_bound(idx, old_lb, old_ub, instance.lb[idx], instance.ub[idx])
+                    self._mark_cols([idx])
+                    self._mark_rows(instance.col_entries(idx)[0])
+                    self.applied_reductions.append(r)
             elif r.kind == 'tighten_coefficient':
                 row_name, var_name = r.target
                 old, new = r.value
-                try:
-                    row_idx = np.where(self.instance.row_names == row_name)[0][0]
-                    col_idx = self.instance.var_names.index(var_name)
-                    self.instance.A[row_idx, col_idx] = new
-                    self.applied_reductions.append(r)
-                except ValueError:
+                row_idx = self._row(r, row_name)
+                col_idx = self._column(r, var_name)
+                if row_idx is None or col_idx is None:
                     print(f"    Skipped tightening: row {row_name} or variable {var_name} no longer exists")
+                    continue
+                if not (self.row_keep[row_idx] and self.col_keep[col_idx]):
+                    continue
+                activity = self._activity()
+                self._set_coefficient(row_idx, col_idx, new)
+                if activity is not None:
+                    activity.recompute_rows([row_idx])
+                self._mark_rows([row_idx])
+                self._mark_cols([col_idx])
+                self.applied_reductions.append(r)
             elif r.kind == 'remove_constraint':
                 cname = r.target
-                try:
-                    idx = np.where(self.instance.row_names == cname)[0][0]
-                    self.instance.A=np.delete(self.instance.A,idx,0)
-                    self.instance.b=np.delete(self.instance.b,idx)
-                    self.instance.sense=np.delete(self.instance.sense,idx)
-                    self.instance.row_names=np.delete(self.instance.row_names,idx)
-                    self.applied_reductions.append(r)
-                except Exception as e:
-                    print(f"Failed to remove empty constraint {cname}: {e}")
+                idx = self._row(r, cname)
+                if idx is None:
+                    print(f"Failed to remove empty constraint {cname}: not found")
+                    continue
+                if not self.row_keep[idx]:
+                    continue
+                # Until compaction the row stays in place as a free ('N') row that presolvers ignore
+                self.row_keep[idx] = False
+                instance.sense[idx] = 'N'
+                self._mark_cols(instance.row_entries(idx)[0])
+                self.applied_reductions.append(r)
             elif r.kind=='remove_variable':
                 vname = r.target
-                try:
-                    idx=self.instance.var_names.index(vname)
-                    self.instance.A=np.delete(self.instance.A,idx,1)
-                    self.instance.obj=np.delete(self.instance.obj,idx)
-                    self.instance.lb=np.delete(self.instance.lb,idx)
-                    self.instance.ub=np.delete(self.instance.ub,idx)
-                    del self.instance.var_names[idx]
-                    del self.instance.var_types[idx]
-                    self.applied_reductions.append(r)
-                except ValueError:
+                idx = self._column(r, vname)
+                if idx is None:
                     print(f"    Failed to remove variable {vname}: not found")
+                    continue
+                if not self.col_keep[idx]:
+                    continue
+                self.postsolve_stack.push_removed(self.col_origin[idx], instance.lb[idx], instance.ub[idx],
+                                                  self._rows_of_column(idx))
+                self.col_keep[idx] = False
+                self._mark_neighbourhood(idx)
+                self.applied_reductions.append(r)
             elif r.kind == 'fix_variable':
                 vname = r.target
-                try:
-                    idx = self.instance.var_names.index(vname)
-                    value=r.value
-                    self.instance.b-=self.instance.A[:,idx]*value
-                    if hasattr(self.instance, "obj_const"):
-                        self.instance.obj_const += self.instance.obj[idx] * value
-                    else:
-                        self.instance.obj_const = self.instance.obj[idx] * value
-                    self.instance.obj[idx] = 0.0  # Optional: mark as 0
-                    self.instance.A=np.delete(self.instance.A,idx,axis=1)
-                    self.instance.obj=np.delete(self.instance.obj,idx)
-                    self.instance.lb=np.delete(self.instance.lb,idx)
-                    self.instance.ub=np.delete(self.instance.ub,idx)
-                    del self.instance.var_names[idx]
-                    del self.instance.var_types[idx]
-                    self.applied_reductions.append(r)
-                except ValueError:
+                idx = self._column(r, vname)
+                if idx is None:
                     print(f"    Failed to fix variable {vname}: not found")
+                    continue
+                if not self.col_keep[idx]:
+                    continue
+                value=r.value
+                if hasattr(instance, "obj_const"):
+                    instance.obj_const += instance.obj[idx] * value
+                else:
+                    instance.obj_const = instance.obj[idx] * value
+                instance.obj[idx] = 0.0
+                # The column keeps its coefficients with lb = ub = value until compaction moves it to the rhs
+                old_lb, old_ub = instance.lb[idx], instance.ub[idx]
+                instance.lb[idx] = value
+                instance.ub[idx] = value
+                activity = self._activity()
+                if activity is not None:
+                    activity.update_bound(idx, old_lb, old_ub, value, value)
+                self.fixed_values[idx] = value
+                self.col_fixed[idx] = True
+                self.col_keep[idx] = False
+                self.postsolve_stack.push_fixed(self.col_origin[idx], value)
+                self._mark_neighbourhood(idx)
+                self.applied_reductions.append(r)
             elif r.kind=='substitute_variable':
                 const_term,expr_terms=r.value
                 target=r.target
-                self.instance.apply_substitution_expr(target,const_term,expr_terms)
+                idx_target = self._column(r, target)
+                if idx_target is None:
+                    print(f"    [WARN] Cannot substitute: {target} not in model")
+                    continue
+                if not self.col_keep[idx_target]:
+                    continue
+                terms = []
+                for coeff_i, var_i in expr_terms:
+                    idx_i = self._column_by_name(var_i)
+                    if idx_i is not None and self.col_keep[idx_i]:
+                        terms.append((coeff_i, idx_i))
+                    elif idx_i is not None and self.col_fixed[idx_i]:
+                        # Fixed earlier in the round but not compacted yet: the term is a constant
+                        const_term += coeff_i * self.fixed_values[idx_i]
+                    else:
+                        print(f"    [WARN] Substitution term {var_i} not found")
+                self.postsolve_stack.push_substituted(self.col_origin[idx_target], const_term,
+                                                      [(coeff_i, self.col_origin[idx_i]) for coeff_i, idx_i in terms])
+                self._mark_neighbourhood(idx_target)
+                self._mark_cols([idx_i for _, idx_i in terms])
+                activity = self._activity()
+                rows_target, _ = instance.col_entries(idx_target)
+                instance.substitute_column(idx_target, const_term, terms)
+                if activity is not None:
+                    activity.recompute_rows(rows_target)
+                self.col_keep[idx_target] = False
                 self.applied_reductions.append(r)
 
+    def postsolve(self, x_reduced) -> np.ndarray:
+        """
+        Maps a solution of the presolved model back to the variables of the original model.
+        Extra trailing entries (e.g. complement variables added by the solver) are ignored.
+        """
+        self.compact()
+        return self.postsolve_stack.postsolve(x_reduced, self.col_origin)
+
+    def _rows_of_column(self, idx):
+        """
+        The live rows containing column idx, written over the original indices of their other
+        live columns. Columns fixed earlier in the round are folded into the rhs.
+        """
+        instance = self.instance
+        rows = []
+        row_idxs, col_vals = instance.col_entries(idx)
+        for i, a_j in zip(row_idxs, col_vals):
+            if not self.row_keep[i]:
+                continue
+            cols, vals = instance.row_entries(i)
+            alive = self.col_keep[cols] & (cols != idx)
+            rhs = instance.b[i] - np.dot(vals[~self.col_keep[cols]], self.fixed_values[cols[~self.col_keep[cols]]])
+            rows.append((self.col_origin[cols[alive]], vals[alive].copy(), a_j, rhs, instance.sense[i]))
+        return rows
+
+    def _set_coefficient(self, row_idx, col_idx, value):
+        A = self.instance.A
+        start, end = A.indptr[row_idx], A.indptr[row_idx + 1]
+        pos = start + np.searchsorted(A.indices[start:end], col_idx)
+        if pos < end and A.indices[pos] == col_idx:
+            A.data[pos] = value
+            if value == 0:
+                A.eliminate_zeros()
+            self.instance.invalidate_columns()
+        elif value != 0:
+            A[row_idx, col_idx] = value
+            self.instance.invalidate_columns()
+
+    def _activity(self):
+        """The shared activity bounds if they are in sync with the current matrix, else None."""
+        activity = self.instance.activity
+        if activity is not None and activity.matrix is self.instance.A:
+            return activity
+        return None
+
     def summary(self):
         print("Presolve complete. Reductions applied:")
         counter=Counter(r.kind for r in self.applied_reductions)
         for kind,count in counter.items():
             print(f"{kind}: {count}")
+        if any(stats.calls for stats in self.stats.values()):
+            print(f"{'Presolver':<22} | {'Calls':>5} | {'Rows':>8} | {'Cols':>8} | {'Found':>7} | {'Applied':>7} | {'Time (s)':>8}")
+            for name, stats in self.stats.items():
+                print(f"{name:<22} | {stats.calls:>5} | {stats.rows_examined:>8} | {stats.cols_examined:>8} | "
+                      f"{stats.found:>7} | {stats.applied:>7} | {stats.time:>8.3f}")
@@ -0,0 +1,26 @@
+from reader.reader import MIPInstance
+from presolve.ModelCanonicalizer import ModelCanonicalizer
+from presolve.engine import PresolveEngine
+from presolve.clean_model import CleanModel
+from presolve.singleton_cols import ColSingletonRemover
+from presolve.bound_tightening import BoundTightener
+from presolve.coeff_tightening import CoefficientTightening
+from presolve.dual_fix import DualFix
+
+
+def run_presolve(instance: MIPInstance):
+    """
+    Runs the full presolve pipeline on the given instance,
+    modifying it in place. Returns the engine, whose postsolve()
+    maps solutions back to the original variables
+    """
+    ModelCanonicalizer().apply(instance)
+    engine = PresolveEngine(instance)
+    engine.register(CleanModel())
+    engine.register(ColSingletonRemover())
+    engine.register(BoundTightener())
+    engine.register(CoefficientTightening())
+    engine.register(DualFix())
+    engine.run()
+    engine.summary()
+    return engine
@@ -0,0 +1,64 @@
+from typing import List, Tuple
+import numpy as np
+
+
+class PostsolveStack:
+    """
+    Records how each variable eliminated by presolve can be recovered from the variables
+    that were still in the model at that point. Undoing the steps in reverse order maps a
+    solution of the presolved model back to the original variable space.
+    """
+    def __init__(self, var_names: List[str], var_types: List[str]):
+        self.var_names = list(var_names)
+        self.var_types = list(var_types)
+        self.steps = []
+
+    def __len__(self):
+        return len(self.steps)
+
+    def push_fixed(self, j: int, value: float):
+        self.steps.append(('fixed', j, value))
+
+    def push_substituted(self, j: int, const_term: float, terms: List[Tuple[float, int]]):
+        """x_j = const_term + sum(coeff_i * x_i), with i given in original indices."""
+        self.steps.append(('substituted', j, (const_term, terms)))
+
+    def push_removed(self, j: int, lb: float, ub: float, rows):
+        """
+        x_j was dropped from the model. `rows` holds (cols, coeffs, a_j, rhs, sense) for every
+        row it appeared in, cols being original indices of the other variables of the row.
+        """
+        self.steps.append(('removed', j, (lb, ub, rows)))
+
+    def postsolve(self, x_reduced, kept: np.ndarray) -> np.ndarray:
+        """
+        Expands a solution of the presolved model to the original variables.
+        `kept[k]` is the original index of the k-th variable of the presolved model.
+        """
+        x = np.full(len(self.var_names), np.nan)
+        x[kept] = np.asarray(x_reduced, dtype=float)[:len(kept)]
+        for kind, j, data in reversed(self.steps):
+            if kind == 'fixed':
+                x[j] = data
+            elif kind == 'substituted':
+                const_term, terms = data
+                x[j] = const_term + sum(coeff_i * x[i] for coeff_i, i in terms)
+            elif kind == 'removed':
+                x[j] = self._recover_removed(j, x, *data)
+        return x
+
+    def _recover_removed(self, j, x, lb, ub, rows):
+        lo, hi = lb, ub
+        for cols, coeffs, a_j, rhs, sense in rows:
+            limit = (rhs - np.dot(coeffs, x[cols])) / a_j
+            if sense == 'E':
+                lo = hi = limit
+            elif a_j > 0:
+                hi = min(hi, limit)
+            else:
+                lo = max(lo, limit)
+        value = min(max(0.0, lo), hi)
+        if self.var_types[j] in ('B', 'I'):
+            rounded = np.ceil(value - 1e-9)
+            value = rounded if rounded <= hi + 1e-9 else np.floor(value + 1e-9)
+        return value
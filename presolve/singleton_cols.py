@@ -6,34 +6,32 @@ class ColSingletonRemover(Presolver):
     def __init__(self):
         super().__init__("ColSingletonRemover")
 
-    def apply(self, instance) -> List[Reduction]:
+    def apply(self, instance, rows=None, cols=None) -> List[Reduction]:
         A = instance.A
         b=instance.b
         sense=instance.sense
         var_names=instance.var_names
         row_names=instance.row_names
         reductions = []
-        for j in range(A.shape[1]):
-            col = A[:, j]
-            row_indices=np.flatnonzero(col)
+        for j in (range(A.shape[1]) if cols is None else cols):
+            row_indices,col_vals=instance.col_entries(j)
             if len(row_indices)==1: #If it is a singleton column
                 i=row_indices[0] #The only row this singleton variable appears in
                 if sense[i] != 'E':
                     continue
-                row = A[i, :]
-                if len(np.flatnonzero(row))!=2:
+                row_cols,row_vals=instance.row_entries(i)
+                if len(row_cols)!=2:
                     continue
-                coeff_j=A[i,j]
+                coeff_j=col_vals[0]
                 rhs=b[i]
                 x_to_sub = var_names[j]
                 terms=[]
-                for k in np.flatnonzero(row):
+                for k,coeff_k in zip(row_cols,row_vals):
                     if k!=j:
-                        coeff_k=A[i,k]
                         other_var=var_names[k]
                         terms.append((-coeff_k/coeff_j,other_var))
                 const_term=rhs/coeff_j
-                reductions.append(Reduction(kind='substitute_variable',target=x_to_sub,value=(const_term,terms)))
-                reductions.append(Reduction(kind='remove_constraint',target=row_names[i],value=None))
+                reductions.append(Reduction(kind='substitute_variable',target=x_to_sub,value=(const_term,terms),index=j))
+                reductions.append(Reduction(kind='remove_constraint',target=row_names[i],value=None,index=i))
                 print("Remove constraint comes from Singleton Column ")
         return reductions
\ No newline at end of file
@@ -91,6 +91,7 @@ def debug_presolve(instance_path):
                 print(f"[PreSolver {presolver.name}] Applying reduction: {r}")
 
             engine._apply_reductions(reductions)
+            engine.compact()
 
 
             step_obj=None
@@ -1,8 +1,10 @@
 import numpy as np
+import scipy.sparse as sp
 import gurobipy as gp
 from gurobipy import GRB
 from typing import List, Tuple, Dict
 import os
+import copy
 
 class MIPInstance:
     def __init__(self, mps_path: str):
@@ -26,9 +28,66 @@ class MIPInstance:
         self.obj = []
         self.obj_const = 0
         self.root_lp_model=None
+        self.activity = None
+        self._integer_mask = None
 
         self._extract_data()
 
+    @property
+    def A(self):
+        """Constraint matrix in CSR format (row access)."""
+        return self._A
+
+    @A.setter
+    def A(self, matrix):
+        self._A = None if matrix is None else sp.csr_matrix(matrix)
+        if self._A is not None:
+            self._A.sort_indices()
+        self._A_csc = None
+
+    @property
+    def A_csc(self):
+        """Column-major (CSC) mirror of A, rebuilt lazily after A is replaced."""
+        if self._A_csc is None and self._A is not None:
+            self._A_csc = self._A.tocsc()
+        return self._A_csc
+
+    @property
+    def integer_mask(self):
+        """Boolean mask of the binary and integer variables, cached until var_types changes size."""
+        if self._integer_mask is None or len(self._integer_mask) != len(self.var_types):
+            self._integer_mask = np.array([vtype in ('B', 'I') for vtype in self.var_types], dtype=bool)
+        return self._integer_mask
+
+    def invalidate_columns(self):
+        """Must be called after editing A.data in place so the CSC mirror is rebuilt."""
+        self._A_csc = None
+
+    def row_entries(self, i):
+        """Returns (column indices, coefficients) of the nonzeros of row i."""
+        start, end = self._A.indptr[i], self._A.indptr[i + 1]
+        return self._A.indices[start:end], self._A.data[start:end]
+
+    def rows_nonzeros(self, rows=None):
+        """
+        Row index, column index, coefficient and position in A.data of every nonzero in
+        the given rows (all rows if None), as parallel arrays.
+        """
+        A = self._A
+        if rows is None:
+            return np.repeat(np.arange(A.shape[0]), np.diff(A.indptr)), A.indices, A.data, np.arange(A.nnz)
+        rows = np.asarray(rows, dtype=int)
+        starts = A.indptr[rows]
+        counts = A.indptr[rows + 1] - starts
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        return np.repeat(rows, counts), A.indices[positions], A.data[positions], positions
+
+    def col_entries(self, j):
+        """Returns (row indices, coefficients) of the nonzeros of column j."""
+        A_csc = self.A_csc
+        start, end = A_csc.indptr[j], A_csc.indptr[j + 1]
+        return A_csc.indices[start:end], A_csc.data[start:end]
+
     @property
     def num_vars(self) -> int:
         return len(self.var_names)
@@ -74,7 +133,8 @@ class MIPInstance:
         self.b = np.array([c.RHS for c in constraints])
         sense_map = {GRB.LESS_EQUAL: 'L', GRB.GREATER_EQUAL: 'G', GRB.EQUAL: 'E'}
         self.sense = [sense_map[c.Sense] for c in constraints]
-        self.A = self.model.getA().toarray()
+        self.A = self.model.getA()
+        self.A.eliminate_zeros()
 
         if self.sense_obj == -1:
             self.obj = -self.obj
@@ -100,26 +160,91 @@ class MIPInstance:
             print(f"    [WARN] Cannot substitute: {target_var} not in model")
             return
         idx_target = self.var_names.index(target_var)
-        coeff_target = self.obj[idx_target]
-        self.obj_const += coeff_target * const_term
+        terms = []
         for coeff_i, var_i in expr_terms:
             if var_i in self.var_names:
-                idx_i = self.var_names.index(var_i)
-                self.obj[idx_i] += coeff_target * coeff_i
+                terms.append((coeff_i, self.var_names.index(var_i)))
             else:
                 print(f"    [WARN] Substitution term {var_i} not found")
-        col_target = self.A[:, idx_target].copy()
-        self.b-=col_target*const_term
-        for coeff_i, var_i in expr_terms:
-            if var_i in self.var_names:
-                idx_i = self.var_names.index(var_i)
-                self.A[:, idx_i] += coeff_i * col_target
-        self.A = np.delete(self.A, idx_target, axis=1)
-        self.obj = np.delete(self.obj, idx_target)
-        self.lb = np.delete(self.lb, idx_target)
-        self.ub = np.delete(self.ub, idx_target)
-        del self.var_names[idx_target]
-        del self.var_types[idx_target]
+        self.substitute_column(idx_target, const_term, terms)
+        keep = np.ones(self.num_vars, dtype=bool)
+        keep[idx_target] = False
+        self.compact(np.ones(self.num_constraints, dtype=bool), keep)
+
+    def substitute_column(self, idx_target: int, const_term: float, terms: List[Tuple[float, int]]):
+        """
+        Replaces x_target by const_term + sum(coeff_i * x_i) in the objective and in every row.
+        Column idx_target is left empty with zero cost rather than deleted, so that all other
+        row and column indices stay valid until the next call to compact().
+        """
+        coeff_target = self.obj[idx_target]
+        self.obj_const += coeff_target * const_term
+        for coeff_i, idx_i in terms:
+            self.obj[idx_i] += coeff_target * coeff_i
+        self.obj[idx_target] = 0.0
+        rows_target, vals_target = self.col_entries(idx_target)
+        self.b[rows_target] -= vals_target * const_term
+        # Only the rows of column t change: coeff_i * A[:, t] is added to each A[:, i] and column t
+        # is emptied. The change is applied to the CSR matrix and to its CSC mirror alike
+        term_cols = np.array([idx_i for _, idx_i in terms], dtype=int)
+        term_coeffs = np.array([coeff_i for coeff_i, _ in terms], dtype=float)
+        delta_rows = np.concatenate([np.repeat(rows_target, len(terms)), rows_target])
+        delta_cols = np.concatenate([np.tile(term_cols, len(rows_target)), np.full(len(rows_target), idx_target)])
+        delta_vals = np.concatenate([np.outer(vals_target, term_coeffs).ravel(), -vals_target])
+        delta = sp.csr_matrix((delta_vals, (delta_rows, delta_cols)), shape=self._A.shape)
+        A_csc = self._A_csc
+        A = self._A + delta
+        A.eliminate_zeros()
+        self.A = A
+        if A_csc is not None:
+            A_csc = A_csc + delta.tocsc()
+            A_csc.eliminate_zeros()
+            A_csc.sort_indices()
+            self._A_csc = A_csc
+
+    def compact(self, row_keep, col_keep):
+        """Drops the rows and columns not selected by the boolean masks, copying the data once."""
+        if not row_keep.all():
+            self.A = self.A[row_keep]
+            self.b = self.b[row_keep]
+            self.sense = np.asarray(self.sense)[row_keep]
+            self.row_names = self.row_names[row_keep]
+        if not col_keep.all():
+            self.A = self.A[:, col_keep]
+            self.obj = self.obj[col_keep]
+            self.lb = self.lb[col_keep]
+            self.ub = self.ub[col_keep]
+            self.var_names = [name for name, keep in zip(self.var_names, col_keep) if keep]
+            self.var_types = [vtype for vtype, keep in zip(self.var_types, col_keep) if keep]
+            self._integer_mask = None
+
+    def sub_instance(self, lb, ub):
+        """
+        Copy of the instance with the variable bounds replaced by lb and ub, e.g. the sub-MIP
+        of a heuristic. Only the Gurobi model the instance was read from is shared.
+        """
+        sub = copy.copy(self)
+        sub.A = self._A.copy()
+        sub.b = np.array(self.b, dtype=float)
+        sub.sense = list(self.sense)
+        sub.row_names = np.array(self.row_names)
+        sub.obj = np.array(self.obj, dtype=float)
+        sub.lb = np.array(lb, dtype=float)
+        sub.ub = np.array(ub, dtype=float)
+        sub.var_names = list(self.var_names)
+        sub.var_types = list(self.var_types)
+        sub.root_lp_model = None
+        sub.activity = None
+        sub._integer_mask = None
+        return sub
+
+    def add_row(self, cols, vals, sense, rhs, name):
+        """Appends the row sum(vals * x[cols]) <sense> rhs."""
+        row = sp.csr_matrix((vals, (np.zeros(len(cols), dtype=int), cols)), shape=(1, self.num_vars))
+        self.A = sp.vstack([self._A, row], format='csr')
+        self.b = np.append(self.b, rhs)
+        self.sense = list(self.sense) + [sense]
+        self.row_names = np.append(self.row_names, name)
 
     def build_root_model(self):
         if self.root_lp_model is not None:
@@ -139,7 +264,8 @@ class MIPInstance:
         obj_expr=gp.quicksum(self.obj[j]*x[j] for j in range(self.num_vars))
         model.setObjective(obj_expr+self.obj_const, gp.GRB.MINIMIZE)
         for i in range(self.num_constraints):
-            lhs = gp.quicksum(self.A[i, j] * x[j] for j in range(self.num_vars) if self.A[i, j] != 0)
+            cols, vals = self.row_entries(i)
+            lhs = gp.quicksum(a_ij * x[j] for j, a_ij in zip(cols, vals))
             sense = self.sense[i]
             rhs = self.b[i]
             if sense == 'L':
@@ -152,11 +278,29 @@ class MIPInstance:
         self.root_lp_model=model
 
     def is_integral(self, solution, tol=1e-6):
-        for i, vtype in enumerate(self.var_types):
-            if vtype in ['B', 'I']:  # Only check integer/binary vars
-                if abs(solution[i] - round(solution[i])) > tol:
-                    return False
-        return True
+        return len(self.integer_infeasibilities(solution, tol)) == 0
+
+    def integer_infeasibilities(self, solution, tol=1e-6):
+        """Indices of the integer variables whose value in `solution` is fractional."""
+        x = np.asarray(solution, dtype=float)
+        return np.flatnonzero(self.integer_mask & (np.abs(x - np.round(x)) > tol))
+
+    def row_violations(self, solution, tol=1e-6):
+        """
+        Violation of every row by `solution`, evaluated with one sparse mat-vec: activity - b
+        for 'L' rows, b - activity for 'G' rows, |activity - b| for 'E' rows ('N' rows are
+        free). Returns (max violation, sum of violations, indices of the rows violated by
+        more than tol).
+        """
+        residual = self._A @ np.asarray(solution, dtype=float) - np.asarray(self.b, dtype=float)
+        sense = np.asarray(self.sense)
+        violation = np.where(sense == 'L', residual,
+                             np.where(sense == 'G', -residual,
+                                      np.where(sense == 'E', np.abs(residual), 0.0)))
+        violation = np.maximum(violation, 0.0)
+        if len(violation) == 0:
+            return 0.0, 0.0, np.flatnonzero(violation)
+        return float(violation.max()), float(violation.sum()), np.flatnonzero(violation > tol)
 
     def _complement_all_binary_vars(self):
         """
@@ -177,7 +321,8 @@ class MIPInstance:
         self.original_num_constrs = self.num_constraints
 
         # Create a mapping from original variable index to its new complement's index
-        complement_map = {}
+        num_complements = len(original_binary_indices)
+        complement_map = {j: self.original_num_vars + k for k, j in enumerate(original_binary_indices)}
 
         # 2. Add a new complement variable for each original binary variable
         for j in original_binary_indices:
@@ -187,46 +332,39 @@ class MIPInstance:
             # Add the new variable's properties
             self.var_names.append(complement_name)
             self.var_types.append('B')
-            self.lb = np.append(self.lb, 0.0)
-            self.ub = np.append(self.ub, 1.0)
-            self.obj = np.append(self.obj, 0.0)
+        self._integer_mask = None
+        self.lb = np.append(self.lb, np.zeros(num_complements))
+        self.ub = np.append(self.ub, np.ones(num_complements))
+        self.obj = np.append(self.obj, np.zeros(num_complements))
 
-            # Add a new column of zeros to the A matrix for the new variable
-            new_col = np.zeros((self.A.shape[0], 1))
-            self.A = np.hstack([self.A, new_col])
-
-            # Store the index of the newly created complement variable
-            complement_map[j] = self.num_vars - 1
-
-        # 3. Add linking constraints (x + x_comp = 1) for all pairs
-        for j in original_binary_indices:
-            link_row = np.zeros((1, self.num_vars))
-            link_row[0, j] = 1.0
-            link_row[0, complement_map[j]] = 1.0
-
-            self.A = np.vstack([self.A, link_row])
-            self.b = np.append(self.b, 1.0)
-            self.sense = np.append(self.sense, 'E')
-            self.row_names = np.append(self.row_names, f"link_{self.var_names[j]}")
-
-        # 4. Perform the substitution: replace `-a*x` with `a*(1 - x_comp)`
+        # 3. Perform the substitution: replace `-a*x` with `a*(1 - x_comp)`
         # This is equivalent to: `a - a*x_comp`
-        for i in range(self.original_num_constrs):
-            for j in original_binary_indices:
-                coeff = self.A[i, j]
-                if coeff < 0:
-                    # The term is -a_ij * x_j. Substitute x_j = 1 - x_j_comp
-                    # The term becomes -a_ij * (1 - x_j_comp) = -a_ij + a_ij * x_j_comp
-
-                    # Add the constant term `-a_ij` to the RHS
-                    self.b[i] -= coeff
-
-                    # Add the new variable term `+a_ij * x_j_comp`
-                    complement_idx = complement_map[j]
-                    self.A[i, complement_idx] += -coeff  # Add the positive coefficient
-
-                    # Remove the original negative term by setting its coefficient to 0
-                    self.A[i, j] = 0.0
+        A = self.A.tocoo()
+        is_binary = np.zeros(self.original_num_vars, dtype=bool)
+        is_binary[original_binary_indices] = True
+        negative = (A.data < 0) & is_binary[A.col]
+
+        # Add the constant term `-a_ij` to the RHS
+        np.subtract.at(self.b, A.row[negative], A.data[negative])
+
+        # Move the coefficient `+a_ij` onto x_j_comp and drop the original negative term
+        comp_index = np.zeros(self.original_num_vars, dtype=A.col.dtype)
+        comp_index[original_binary_indices] = list(complement_map.values())
+        rows = np.concatenate([A.row[~negative], A.row[negative]])
+        cols = np.concatenate([A.col[~negative], comp_index[A.col[negative]]])
+        vals = np.concatenate([A.data[~negative], -A.data[negative]])
+
+        # 4. Add linking constraints (x + x_comp = 1) for all pairs
+        link_rows = self.original_num_constrs + np.arange(num_complements)
+        rows = np.concatenate([rows, link_rows, link_rows])
+        cols = np.concatenate([cols, original_binary_indices, list(complement_map.values())])
+        vals = np.concatenate([vals, np.ones(2 * num_complements)])
+        self.A = sp.csr_matrix((vals, (rows, cols)),
+                               shape=(self.original_num_constrs + num_complements, self.num_vars))
+
+        self.b = np.append(self.b, np.ones(num_complements))
+        self.sense = np.append(self.sense, ['E'] * num_complements)
+        self.row_names = np.append(self.row_names, [f"link_{self.var_names[j]}" for j in original_binary_indices])
 
         # print(f"    Added {len(original_binary_indices)} complement variables and linking constraints.")
 
@@ -243,12 +381,14 @@ class MIPInstance:
 
         for i in range(self.num_constraints):
             # Find the indices of all variables with non-zero coefficients in this row
-            vars_in_row = set(np.nonzero(self.A[i, :])[0])
+            cols, vals = self.row_entries(i)
+            coeffs = dict(zip(cols.tolist(), vals.tolist()))
+            vars_in_row = set(coeffs)
 
             # If all variables in the constraint are binary, it's a candidate
             if vars_in_row and vars_in_row.issubset(binary_indices):
                 total_binary_constraints +=1
-                constraint_terms = [(j, self.A[i, j]) for j in vars_in_row]
+                constraint_terms = [(j, coeffs[j]) for j in vars_in_row]
 
                 if all(coeff > 0 for _, coeff in constraint_terms):
                     positive_binary_constraints.append(constraint_terms)
@@ -290,10 +430,11 @@ class MIPInstance:
 
         # Add constraints
         for i in range(self.num_constraints):
-            lhs = gp.quicksum(self.A[i, j] * vars[j] for j in range(self.num_vars) if self.A[i, j] != 0)
+            cols, vals = self.row_entries(i)
+            lhs = gp.quicksum(a_ij * vars[j] for j, a_ij in zip(cols, vals))
             sense_char = self.sense[i]
             sense = GRB.LESS_EQUAL if sense_char == 'L' else (GRB.GREATER_EQUAL if sense_char == 'G' else GRB.EQUAL)
-            model.addConstr(lhs, sense, self.b[i], name=self.row_names[i])
+            model.addLConstr(lhs, sense, self.b[i], name=self.row_names[i])
 
         # Set objective
         objective_expression = gp.quicksum(self.obj[j] * vars[j] for j in range(self.num_vars))
@@ -0,0 +1,8 @@
+import os
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def instance_path(name):
+    """Path of an instance bundled in reader/."""
+    return os.path.join(REPO, "reader", name)
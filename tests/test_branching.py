@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from bnb.branching import Branching
+
+
+def _brancher(names):
+    n = len(names)
+    return Branching(SimpleNamespace(num_vars=n, var_names=list(names), lb=np.zeros(n), ub=np.ones(n)))
+
+
+def _fill(brancher, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(50):
+        var = int(rng.integers(len(brancher.score)))
+        brancher._update_strong_pseudocosts(var, float(rng.uniform(0.05, 0.95)), float(rng.uniform(0, 5)),
+                                            float(rng.uniform(0, 5)))
+
+
+def test_running_averages_match_a_recount():
+    brancher = _brancher([f"x{j}" for j in range(8)])
+    _fill(brancher)
+    avg_down, avg_up = brancher.average_pseudocosts()
+    up, down = brancher.pseudocounts_up > 0, brancher.pseudocounts_down > 0
+    assert avg_up == pytest.approx(np.mean(brancher.pseudocosts_up[up] / brancher.pseudocounts_up[up]))
+    assert avg_down == pytest.approx(np.mean(brancher.pseudocosts_down[down] / brancher.pseudocounts_down[down]))
+
+
+def test_history_is_matched_by_name(tmp_path):
+    source = _brancher(["a", "b", "c", "d"])
+    _fill(source)
+    path = str(tmp_path / "history.npz")
+    source.save_history(path)
+
+    target = _brancher(["d", "z", "b"])
+    assert target.load_history(path) == 2
+    for dst, src in ((0, 3), (2, 1)):
+        assert target.pseudocosts_up[dst] == source.pseudocosts_up[src]
+        assert target.pseudocounts_down[dst] == source.pseudocounts_down[src]
+    assert target.pseudocounts_up[1] == 0 and target.pseudocounts_down[1] == 0
+    up, down = target.pseudocounts_up > 0, target.pseudocounts_down > 0
+    assert target.average_pseudocosts() == pytest.approx(
+        (np.mean(target.pseudocosts_down[down] / target.pseudocounts_down[down]),
+         np.mean(target.pseudocosts_up[up] / target.pseudocounts_up[up])))
@@ -0,0 +1,39 @@
+import io
+import contextlib
+
+import numpy as np
+import pytest
+
+from conftest import instance_path
+from reader.reader import MIPInstance
+from presolve.pipeline import run_presolve
+from bnb.solver import BranchAndBoundSolver
+from bnb.params import SolverParams
+
+
+def _solve(path, resume, node_limit=None, clique_cuts=False):
+    instance = MIPInstance(instance_path("instance_0004.mps"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_presolve(instance)
+        solver = BranchAndBoundSolver(instance, clique_cuts=clique_cuts, strong_k=20, checkpoint=path, resume=resume,
+                                      params=SolverParams(node_limit=node_limit, enable_lns=False))
+        result = solver.solve()
+    return solver, result
+
+
+@pytest.mark.parametrize("clique_cuts", [False, True])
+def test_resumed_search_reaches_the_optimum(tmp_path, clique_cuts):
+    path = str(tmp_path / "search.npz")
+    stopped, _ = _solve(path, resume=False, node_limit=5, clique_cuts=clique_cuts)
+    assert stopped.status == 'node_limit'
+    with np.load(path) as state:
+        num_saved_cuts = len(state['cut_rhs'])
+
+    resumed, result = _solve(path, resume=True, clique_cuts=clique_cuts)
+    assert resumed.status == 'optimal'
+    assert resumed.best_obj == pytest.approx(-3.5, abs=1e-6)
+    assert result[-1] > 5 #The node count continues from the checkpoint
+    if clique_cuts:
+        # Restored cuts are known to the pool, which neither separates them again nor loses track of them
+        assert num_saved_cuts > 0
+        assert len(resumed.cut_pool.constrs) == resumed.cut_pool.in_lp.sum() == num_saved_cuts
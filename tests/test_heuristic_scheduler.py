@@ -0,0 +1,45 @@
+from bnb.heuristic_scheduler import HeuristicScheduler
+
+
+def test_frequency_and_effort_adapt_to_failures():
+    scheduler = HeuristicScheduler({'pump': 10}, freq_growth=2.0, max_freq_factor=4, min_effort=0.25)
+    assert not scheduler.due('pump', 5, 0.0)
+    assert scheduler.due('pump', 10, 0.0)
+    for node in (10, 30, 70, 110):
+        scheduler.record('pump', node, 0.0, 0, False)
+    assert scheduler.freqs['pump'] == 40 #Capped at max_freq_factor times the base
+    assert scheduler.effort('pump') == 0.25
+    assert not scheduler.due('pump', 149, 0.0)
+    scheduler.record('pump', 150, 0.0, 0, True)
+    assert scheduler.freqs['pump'] == 10 and scheduler.effort('pump') == 1.0
+
+
+def test_time_budget():
+    scheduler = HeuristicScheduler({'lns': 1}, time_quot=0.1, time_offset=1.0)
+    scheduler.record('lns', 1, 3.0, 0, True)
+    assert not scheduler.due('lns', 2, 10.0)
+    assert scheduler.due('lns', 2, 20.0)
+
+
+def test_select_tries_every_arm_then_prefers_the_successful_one():
+    scheduler = HeuristicScheduler({'diving': 1})
+    arms = ['fractional', 'coefficient']
+    assert scheduler.select('diving', arms) == 'fractional'
+    scheduler.record('diving', 1, 0.0, 0, True, arm='fractional')
+    assert scheduler.select('diving', arms) == 'coefficient'
+    scheduler.record('diving', 2, 0.0, 0, False, arm='coefficient')
+    for node in range(3, 10):
+        arm = scheduler.select('diving', arms)
+        scheduler.record('diving', node, 0.0, 0, arm == 'fractional', arm=arm)
+    assert scheduler.arm_stats[('diving', 'fractional')].calls > scheduler.arm_stats[('diving', 'coefficient')].calls
+
+
+def test_non_adaptive_arms_take_turns():
+    scheduler = HeuristicScheduler({'lns': 5}, adaptive=False)
+    picks = []
+    for node in range(4):
+        arm = scheduler.select('lns', ['rins', 'local_branching'])
+        scheduler.record('lns', node, 0.0, 0, False, arm=arm)
+        picks.append(arm)
+    assert picks == ['rins', 'local_branching', 'rins', 'local_branching']
+    assert scheduler.freqs['lns'] == 5 and scheduler.effort('lns') == 1.0
@@ -0,0 +1,40 @@
+import io
+import contextlib
+
+import numpy as np
+import gurobipy as gp
+import pytest
+
+from conftest import instance_path
+from reader.reader import MIPInstance
+from presolve.pipeline import run_presolve
+
+
+def _optimum(model):
+    model.Params.OutputFlag = 0
+    model.optimize()
+    assert model.Status == gp.GRB.OPTIMAL
+    return model
+
+
+@pytest.mark.parametrize("name", ["instance_0020.mps", "instance_0004.mps", "instance_0001.mps"])
+def test_postsolved_optimum_is_feasible_and_optimal(name):
+    original = MIPInstance(instance_path(name))
+    reference = _optimum(original.model.copy()).ObjVal
+
+    presolved = MIPInstance(instance_path(name))
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = run_presolve(presolved)
+        model = presolved.build_gurobi_model()
+    model = _optimum(model)
+    assert model.ObjVal == pytest.approx(reference, abs=1e-6)
+
+    x_reduced = np.array(model.getAttr("X", model.getVars()))
+    x = engine.postsolve(x_reduced)
+    assert len(x) == original.num_vars
+    assert not np.any(np.isnan(x))
+    # Gurobi's own solution may violate rows within its tolerances; postsolve must not add to that
+    assert original.row_violations(x)[0] <= max(1e-6, presolved.row_violations(x_reduced)[0]) + 1e-9
+    assert original.is_integral(x)
+    assert np.all(x >= original.lb - 1e-6) and np.all(x <= original.ub + 1e-6)
+    assert np.dot(original.obj, x) + original.obj_const == pytest.approx(reference, abs=1e-6)
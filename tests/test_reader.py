@@ -0,0 +1,77 @@
+import numpy as np
+
+from conftest import instance_path
+from reader.reader import MIPInstance
+
+
+def _instance():
+    return MIPInstance(instance_path("instance_0020.mps"))
+
+
+def test_substitute_column_matches_the_dense_substitution():
+    instance = _instance()
+    rng = np.random.default_rng(0)
+    instance.A_csc #The CSC mirror must be updated along with A
+    for _ in range(10):
+        A, b, obj = instance.A.toarray(), np.array(instance.b, dtype=float), np.array(instance.obj, dtype=float)
+        obj_const = instance.obj_const
+        target = int(rng.choice(np.flatnonzero(np.abs(A).sum(axis=0) > 0)))
+        others = [j for j in range(instance.num_vars) if j != target]
+        terms = [(float(rng.normal()), int(j)) for j in rng.choice(others, size=3, replace=False)]
+        const_term = float(rng.normal())
+        instance.substitute_column(target, const_term, terms)
+
+        for coeff, j in terms:
+            A[:, j] += coeff * A[:, target]
+            obj[j] += coeff * obj[target]
+        b -= A[:, target] * const_term
+        obj_const += obj[target] * const_term
+        A[:, target] = 0.0
+        obj[target] = 0.0
+        assert np.allclose(instance.A.toarray(), A)
+        assert np.allclose(instance.A_csc.toarray(), A)
+        assert np.allclose(instance.b, b)
+        assert np.allclose(instance.obj, obj)
+        assert np.isclose(instance.obj_const, obj_const)
+
+
+def test_compact_drops_the_masked_rows_and_columns():
+    instance = _instance()
+    A = instance.A.toarray()
+    rows = np.arange(instance.num_constraints) % 3 != 0
+    cols = np.arange(instance.num_vars) % 4 != 0
+    names = [name for name, keep in zip(instance.var_names, cols) if keep]
+    instance.compact(rows, cols)
+    assert np.array_equal(instance.A.toarray(), A[rows][:, cols])
+    assert instance.var_names == names
+    assert len(instance.b) == len(instance.sense) == len(instance.row_names) == rows.sum()
+    assert len(instance.lb) == len(instance.ub) == len(instance.obj) == len(instance.var_types) == cols.sum()
+
+
+def test_sub_instance_and_add_row_leave_the_instance_alone():
+    instance = _instance()
+    A, num_constraints = instance.A.toarray(), instance.num_constraints
+    lb = np.array(instance.lb, dtype=float)
+    sub = instance.sub_instance(np.zeros(instance.num_vars), np.ones(instance.num_vars))
+    sub.add_row([0, 1], [1.0, 1.0], 'L', 1.0, "extra")
+    sub.obj[0] += 1.0
+    assert sub.num_constraints == num_constraints + 1
+    assert instance.num_constraints == num_constraints
+    assert np.array_equal(instance.A.toarray(), A)
+    assert np.array_equal(instance.lb, lb)
+    assert sub.obj[0] == instance.obj[0] + 1.0
+
+
+def test_row_violations_by_sense():
+    instance = _instance()
+    x = np.random.default_rng(0).uniform(0.0, 1.0, instance.num_vars)
+    activity = instance.A @ x
+    b = np.array(instance.b, dtype=float)
+    expected = np.where(np.asarray(instance.sense) == 'L', activity - b,
+                        np.where(np.asarray(instance.sense) == 'G', b - activity, np.abs(activity - b)))
+    expected = np.maximum(expected, 0.0)
+    max_violation, total, violated = instance.row_violations(x)
+    assert len(violated) > 0
+    assert np.isclose(max_violation, expected.max())
+    assert np.isclose(total, expected.sum())
+    assert np.array_equal(violated, np.flatnonzero(expected > 1e-6))
@@ -0,0 +1,63 @@
+import random
+
+from bnb.node import Node
+from bnb.tree import BranchAndBoundTree
+
+
+def _node(bound):
+    node = Node()
+    node.bound = bound
+    return node
+
+
+def _check_invariants(tree):
+    heap = tree.heap
+    for i in range(1, len(heap)):
+        assert heap[(i - 1) // 2][:2] <= heap[i][:2]
+    assert len(tree.position) == len(heap)
+    for node, i in tree.position.items():
+        assert heap[i][2] is node
+
+
+def test_random_operations_match_a_reference_list():
+    rng = random.Random(0)
+    tree = BranchAndBoundTree()
+    reference = [] #Open nodes in insertion order
+    for _ in range(5000):
+        op = rng.random()
+        if op < 0.5:
+            node = _node(rng.randint(0, 50))
+            tree.push(node)
+            reference.append(node)
+        elif op < 0.75:
+            node = tree.pop_best_bound()
+            if reference:
+                best = min(node.bound for node in reference)
+                expected = next(node for node in reference if node.bound == best) #Ties in insertion order
+                assert node is expected
+                reference.remove(node)
+            else:
+                assert node is None
+        elif op < 0.95:
+            node = tree.pop_dfs()
+            assert node is (reference.pop() if reference else None)
+        else:
+            cutoff = rng.randint(0, 50)
+            pruned = tree.prune(cutoff)
+            assert {id(node) for node in pruned} == {id(node) for node in reference if node.bound > cutoff}
+            reference = [node for node in reference if node.bound <= cutoff]
+        _check_invariants(tree)
+        assert len(tree) == len(reference)
+        assert tree.open_nodes() == reference
+        assert tree.get_best_bound() == min((node.bound for node in reference), default=float('inf'))
+
+
+def test_taken_nodes_are_not_pushed_again():
+    tree = BranchAndBoundTree()
+    node = _node(1.0)
+    tree.push(node)
+    tree.push(node)
+    assert len(tree) == 1
+    assert tree.pop_best_bound() is node and node.processed
+    tree.push(node)
+    assert tree.empty()